@@ -3,8 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import httpx
 import json
+import asyncio
+from typing import Set
 from app.db.mongodb import connect_to_mongodb, close_mongodb_connection
 from app.services.event_service import EventService
+from app.services.scraper import WebScraper, pin_chromedriver_path, quit_warm_scrapers
 
 # Load environment variables
 load_dotenv()
@@ -83,13 +86,27 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Startup work left running in the background; referenced until done so the
+# tasks aren't garbage-collected
+_background_tasks: Set[asyncio.Task] = set()
+
+async def _prepare_browsers():
+    """Pin the chromedriver path, then pre-start a browser if PREWARM_BROWSERS is set."""
+    await asyncio.to_thread(pin_chromedriver_path)
+    await WebScraper.prewarm()
+
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongodb()
+    # May download chromedriver, so it doesn't hold up startup
+    task = asyncio.create_task(_prepare_browsers())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_mongodb_connection()
+    quit_warm_scrapers()
 
 if __name__ == "__main__":
     import uvicorn
@@ -151,9 +151,8 @@ class PurchaseService:
                 # Get user data
                 user_data = await self._get_user_data(user_id)
                 
-                # Initialize scraper
-                self.scraper = WebScraper(headless=True, user_data=user_data)
-                await self.scraper.initialize_driver()
+                # Initialize scraper, on a pre-started browser when one is ready
+                self.scraper = await WebScraper.acquire(user_data=user_data, headless=True)
                 
                 # Update purchase status
                 await self.db.purchases.update_one(
@@ -437,76 +436,13 @@ class PurchaseService:
             return None
     
     async def _check_agreement_checkboxes(self) -> None:
-        """Find and check any agreement or confirmation checkboxes on the page."""
-        try:
-            logger.info("Checking for agreement/confirmation checkboxes")
-            
-            # Common checkbox selectors related to agreements and confirmations
-            checkbox_selectors = [
-                # ID-based selectors
-                "//input[@type='checkbox' and (contains(@id, 'agree') or contains(@id, 'consent') or contains(@id, 'confirm') or contains(@id, 'accept') or contains(@id, 'terms'))]",
-                # Name-based selectors
-                "//input[@type='checkbox' and (contains(@name, 'agree') or contains(@name, 'consent') or contains(@name, 'confirm') or contains(@name, 'accept') or contains(@name, 'terms'))]",
-                # Class-based selectors
-                "//input[@type='checkbox' and (contains(@class, 'agree') or contains(@class, 'consent') or contains(@class, 'confirm') or contains(@class, 'accept') or contains(@class, 'terms'))]",
-                # Label-based selectors
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'consent') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirm') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]/input[@type='checkbox']",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'consent') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirm') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]/preceding-sibling::input[@type='checkbox']",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'consent') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirm') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]/following-sibling::input[@type='checkbox']",
-                # For checkboxes that are children of elements with privacy/terms related text
-                "//div[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]//input[@type='checkbox']",
-                # Cookie consent checkboxes
-                "//input[@type='checkbox' and (contains(@id, 'cookie') or contains(@name, 'cookie') or contains(@class, 'cookie'))]",
-                # General unchecked checkbox (less specific, try last)
-                "//input[@type='checkbox' and not(@checked) and not(contains(@id, 'newsletter') or contains(@name, 'newsletter') or contains(@id, 'subscribe') or contains(@name, 'subscribe'))]"
-            ]
-            
-            checkboxes_checked = 0
-            for selector in checkbox_selectors:
-                elements = self.scraper.driver.find_elements(By.XPATH, selector)
-                for element in elements:
-                    try:
-                        if element.is_displayed() and not element.is_selected():
-                            # Get checkbox label for logging
-                            try:
-                                label_text = "Unknown"
-                                label_id = element.get_attribute("id")
-                                if label_id:
-                                    label_elem = self.scraper.driver.find_element(By.XPATH, f"//label[@for='{label_id}']")
-                                    if label_elem:
-                                        label_text = label_elem.text.strip()
-                                if not label_text or label_text == "Unknown":
-                                    # Try parent or sibling text
-                                    parent = self.scraper.driver.find_element(By.XPATH, f"//input[@id='{label_id}']/parent::*")
-                                    if parent:
-                                        label_text = parent.text.strip()
-                            except:
-                                pass
-                            
-                            # Scroll element into view
-                            self.scraper.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                            await asyncio.sleep(0.5)
-                            
-                            # Click the checkbox
-                            logger.info(f"Checking agreement checkbox: {label_text}")
-                            try:
-                                self.scraper.driver.execute_script("arguments[0].click();", element)
-                            except:
-                                element.click()
-                            
-                            checkboxes_checked += 1
-                            await asyncio.sleep(0.5)
-                    except Exception as e:
-                        logger.debug(f"Error checking checkbox: {e}")
-            
-            if checkboxes_checked > 0:
-                logger.info(f"Checked {checkboxes_checked} agreement/confirmation checkboxes")
-            else:
-                logger.info("No agreement/confirmation checkboxes found or all were already checked")
-                
-        except Exception as e:
-            logger.warning(f"Error checking agreement checkboxes: {e}")
-            # Continue with the process even if there's an error checking checkboxes
+        """Find and check any agreement or confirmation checkboxes on the page.
+        
+        Uses the scraper's handler, whose selectors are built once at import
+        and evaluated in a single page call. The handler's per-URL miss cache
+        is bypassed so the terms box is checked on every checkout attempt.
+        """
+        await self.scraper.check_agreement_checkboxes(use_miss_cache=False)
     
     async def get_purchase_status(self, purchase_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a purchase task.
@@ -1,5 +1,6 @@
 import httpx
-from bs4 import BeautifulSoup
+import numpy as np
+from selectolax.parser import HTMLParser
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -7,55 +8,1688 @@ from webdriver_manager.chrome import ChromeDriverManager
 from loguru import logger
 import time
 import json
-from typing import Dict, Any, Optional, Tuple, List, Union
+from string import Template
+from typing import Dict, Any, Optional, Tuple, List, Union, Mapping, Set
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support.ui import Select  # Added this import
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, ElementClickInterceptedException, JavascriptException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, ElementClickInterceptedException, JavascriptException, WebDriverException
 from selenium.webdriver.common.action_chains import ActionChains
+from concurrent.futures import ProcessPoolExecutor
 import asyncio
+import contextlib
+import multiprocessing
+import multiprocessing.util
 import os
+import re
+import threading
+import types
+
+# Browser console logging in injected scripts follows the service log level
+_JS_DEBUG = os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG"
+
+# File holding the chromedriver path resolved at service startup. Defaults to
+# WebDriver Manager's cache directory, which the service already writes to
+CHROMEDRIVER_PATH_FILE = os.path.expanduser(os.getenv("CHROMEDRIVER_PATH_FILE", "~/.wdm/chromedriver.path"))
+
+# Whether WebScraper.prewarm keeps a browser started ahead of purchases
+PREWARM_BROWSERS = os.getenv("PREWARM_BROWSERS", "false").lower() in ("1", "true", "yes")
+
+# Resolves as soon as React Select options are rendered, bounded by a timeout (ms)
+_WAIT_FOR_OPTIONS_JS = """
+const timeoutMs = arguments[0];
+const cb = arguments[arguments.length - 1];
+const selector = "[id^='react-select'][role='option']";
+if (document.querySelector(selector)) { cb(true); return; }
+const obs = new MutationObserver(() => {
+    if (document.querySelector(selector)) { obs.disconnect(); cb(true); }
+});
+obs.observe(document.body, { childList: true, subtree: true });
+setTimeout(() => { obs.disconnect(); cb(false); }, timeoutMs);
+"""
+
+# Lowercased text of the nearest of 4 ancestor divs with short (< 100 chars) text
+_ANCESTOR_CONTEXT_JS = """
+let parent = arguments[0].parentElement;
+for (let level = 0; level < 4 && parent; parent = parent.parentElement) {
+    if (parent.tagName !== 'DIV') continue;
+    level++;
+    const text = (parent.innerText || '').trim();
+    if (text && text.length < 100) return text.toLowerCase();
+}
+return '';
+"""
+
+# Clicks the first rendered React Select option containing the value; returns its text or null
+_SELECT_OPTION_JS = """
+const value = arguments[0].toLowerCase();
+const options = document.querySelectorAll("[id^='react-select'][role='option']");
+if (!options.length) return null;
+for (const option of options) {
+    if (option.textContent.toLowerCase().includes(value)) {
+        option.click();
+        return option.textContent;
+    }
+}
+return '';
+"""
+
+# Subresources that never affect the DOM automation (images, media, fonts, trackers)
+_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*doubleclick.net*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googlesyndication.com*", "*facebook.net*", "*hotjar.com*"
+]
+
+_PAGE_LOAD_TIMEOUT = 15  # seconds
+
+# Resolves once the window load event has fired
+_WAIT_FOR_LOAD_JS = """
+const cb = arguments[arguments.length - 1];
+if (document.readyState === 'complete') { cb(); return; }
+window.addEventListener('load', () => cb(), { once: true });
+"""
+
+# Installed on every new document: tracks in-flight fetch/XHR requests and
+# exposes window.__scraperNetworkIdle(ms), true once nothing has been pending
+# for at least ms milliseconds. Requests open for longer than 5 s (long
+# polling, beacons, chat and payment widgets) are not counted as pending.
+_NETWORK_IDLE_PROBE_JS = """
+(() => {
+    const longRequestMs = 5000;
+    const inFlight = new Map();
+    let nextId = 0;
+    let lastActivity = performance.now();
+    const start = () => {
+        const id = nextId++;
+        inFlight.set(id, performance.now());
+        lastActivity = performance.now();
+        return id;
+    };
+    const done = (id) => {
+        if (inFlight.delete(id)) lastActivity = performance.now();
+    };
+    const origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function (...args) {
+            const id = start();
+            try {
+                return origFetch.apply(this, args).finally(() => done(id));
+            } catch (e) {
+                done(id);
+                throw e;
+            }
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        const id = start();
+        let sent = false;
+        this.addEventListener('loadend', () => done(id), { once: true });
+        try {
+            const result = origSend.apply(this, args);
+            sent = true;
+            return result;
+        } finally {
+            // A send that throws never fires loadend
+            if (!sent) done(id);
+        }
+    };
+    window.__scraperNetworkIdle = (ms) => {
+        const t = performance.now();
+        for (const started of inFlight.values()) {
+            if (t - started < longRequestMs) return false;
+        }
+        return t - lastActivity >= ms;
+    };
+})();
+"""
+
+# True once the document is parsed (the eager load strategy doesn't wait for
+# subresources) and the network probe (if installed) is idle
+_PAGE_SETTLED_JS = """
+return document.readyState !== 'loading'
+    && (!window.__scraperNetworkIdle || window.__scraperNetworkIdle(arguments[0]));
+"""
+
+_READY_TIMEOUT = 10  # seconds
+
+# True once an injected action has finished, is not navigating away and the
+# page has been quiet (no fetch/XHR) for arguments[0] ms since it finished
+_ACTION_SETTLED_JS = """
+const quietMs = arguments[0];
+return document.readyState !== 'loading'
+    && !window.__actionNavigating
+    && window.__actionDone !== undefined
+    && performance.now() - window.__actionDone >= quietMs
+    && (!window.__scraperNetworkIdle || window.__scraperNetworkIdle(quietMs));
+"""
+
+# Upper bound on waiting for an injected action to navigate, alert or settle
+_ACTION_SETTLE_TIMEOUT = 5  # seconds
+
+# Upper bound on waiting for a click to navigate, replace the button or raise an alert
+_CLICK_SETTLE_TIMEOUT = 5  # seconds
+
+# Upper bound on waiting for the network to go quiet after a payment click
+_PAYMENT_SETTLE_TIMEOUT = 10  # seconds
+
+# Upper bound on waiting for a payment iframe field to take its value
+_FRAME_FIELD_TIMEOUT = 2  # seconds
+
+# Marks a select_product_option scan that found nothing; rescans wait out the TTL
+_SELECTOR_MISS = "__MISS__"
+_SELECTOR_MISS_TTL = 30  # seconds
+_NETWORK_IDLE_MS = 500
+
+# Scrolls down arguments[0] px at a time for arguments[1] steps, pausing
+# arguments[2] ms after each, then visits 25/50/75/100% of the page height and
+# returns to the top. Reports every step where the page grew.
+_SCROLL_PAGE_JS = """
+const [amount, maxScrolls, waitMs, done] = arguments;
+const pause = () => new Promise(resolve => setTimeout(resolve, waitMs));
+(async () => {
+    const growth = [];
+    let height = document.body.scrollHeight;
+    for (let i = 0; i < maxScrolls; i++) {
+        window.scrollBy(0, amount);
+        await pause();
+        const newHeight = document.body.scrollHeight;
+        if (newHeight > height) {
+            growth.push([i, height, newHeight]);
+            height = newHeight;
+        }
+    }
+    // Scroll to specific positions where buttons are commonly found
+    for (const position of [0.25, 0.5, 0.75, 1.0]) {
+        window.scrollTo(0, document.body.scrollHeight * position);
+        await pause();
+    }
+    window.scrollTo(0, 0);
+    done({ growth: growth, height: height });
+})();
+"""
+
+# Quantity field selectors, most specific tier first. The CSS `i` flag gives
+# case-insensitive attribute matching without XPath's translate() idiom.
+_QUANTITY_CSS_TIERS = (
+    "input[id*=quantity i], input[name*=quantity i], input[class*=quantity i], "
+    "input[id*=qty i], input[name*=qty i], input[class*=qty i], "
+    "input[aria-label*=quantity i], input[placeholder*=quantity i]",
+    "input[type=number][min]",  # Often quantity fields have a min attribute
+    "select[id*=qty i], select[name*=qty i], select[class*=qty i]",
+)
+
+# Reads the properties the element loops branch on for a whole batch of
+# elements (arguments[0]) in one call instead of one wire command per read.
+_ELEMENT_PROPS_JS = """
+return arguments[0].map(el => ({
+    tag: el.tagName.toLowerCase(),
+    displayed: !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+        && getComputedStyle(el).visibility !== 'hidden',
+    enabled: !el.disabled,
+    selected: !!(el.checked || el.selected),
+    value: el.value === undefined ? null : el.value,
+    id: el.id,
+    type: (el.type || '').toLowerCase(),
+    text: (el.innerText || '').trim()
+}));
+"""
+
+# Sets an input's value the way framework-controlled inputs expect: clear
+# React's value tracker, use the native setter and dispatch the usual events.
+# With withKeyEvents set, keydown/keyup are dispatched around the change for
+# inputs that only react to typing. Returns the value read back so callers can
+# verify it stuck without another round-trip.
+_SET_INPUT_FN_JS = """
+(function (el, value, withKeyEvents) {
+    if (el._valueTracker) {
+        el._valueTracker.setValue('');
+    }
+    const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+    if (withKeyEvents) {
+        // Typing order: focus and keydown happen before the value changes
+        el.dispatchEvent(new Event('focus', { bubbles: true }));
+        el.dispatchEvent(new KeyboardEvent('keydown', { bubbles: true, key: value.slice(-1) }));
+    }
+    nativeInputValueSetter.call(el, value);
+    
+    // Dispatch events in the correct order
+    if (!withKeyEvents) {
+        el.dispatchEvent(new Event('focus', { bubbles: true }));
+    }
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    if (withKeyEvents) {
+        el.dispatchEvent(new KeyboardEvent('keyup', { bubbles: true, key: value.slice(-1) }));
+    }
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    
+    // Move focus to body element after setting value
+    document.body.focus();
+    el.dispatchEvent(new Event('blur', { bubbles: true }));
+    return el.value;
+})
+"""
+
+# Registered once per document so each call only ships a one-line script
+_INSTALL_SET_INPUT_JS = "window.__scraperSetInput = " + _SET_INPUT_FN_JS.strip() + ";"
+
+# Calls the registered setter; null if it is not installed in this document
+_CALL_SET_INPUT_JS = """
+if (!window.__scraperSetInput) return null;
+return window.__scraperSetInput(arguments[0], arguments[1], !!arguments[2]);
+"""
+
+# Self-contained setter for documents without the registered helper
+_SET_INPUT_JS = "return " + _SET_INPUT_FN_JS.strip() + "(arguments[0], arguments[1], !!arguments[2]);"
+
+# [value, text] of every option in a <select>, in one call
+_SELECT_OPTIONS_JS = """
+return Array.from(arguments[0].options).map(o => [o.value, o.text]);
+"""
+
+# Selects the option at index arguments[1] and notifies listeners
+_SELECT_INDEX_JS = """
+const select = arguments[0];
+select.selectedIndex = arguments[1];
+select.dispatchEvent(new Event('input', { bubbles: true }));
+select.dispatchEvent(new Event('change', { bubbles: true }));
+return select.value;
+"""
+
+# The input controlled by a +/- stepper button (arguments[0]): the first
+# visible text/number input within the button's three nearest ancestors
+_STEPPER_INPUT_JS = """
+let node = arguments[0].parentElement;
+for (let depth = 0; node && depth < 3; depth++, node = node.parentElement) {
+    for (const input of node.querySelectorAll('input')) {
+        if ((input.type === 'number' || input.type === 'text' || input.type === 'tel')
+                && (input.offsetWidth || input.offsetHeight)) {
+            return input;
+        }
+    }
+}
+return null;
+"""
+
+# Clicks arguments[0] arguments[1] times, waiting arguments[2] ms between
+# clicks; reports how many clicks succeeded
+_CLICK_REPEATEDLY_JS = """
+const [el, times, gapMs, done] = arguments;
+(async () => {
+    let clicks = 0;
+    try {
+        for (; clicks < times; clicks++) {
+            el.click();
+            await new Promise(resolve => setTimeout(resolve, gapMs));
+        }
+    } finally {
+        done(clicks);
+    }
+})();
+"""
+
+_STEPPER_CLICK_GAP_MS = 50
+
+# True if arguments[0] has a box, is enabled and accepts pointer events
+_CLICKABLE_JS = """
+const el = arguments[0];
+const rect = el.getBoundingClientRect();
+return rect.width > 0 && rect.height > 0 && !el.disabled
+    && getComputedStyle(el).pointerEvents !== 'none';
+"""
+
+# Installed on every new document with a list of CSS selectors: keeps a live
+# set of matching elements per selector, updated from DOM mutations, and
+# exposes window.__scraperIndex.get(selector) so lookups skip a full-DOM query.
+# Elements that stop matching or leave the DOM are dropped at read time.
+_ELEMENT_INDEX_JS = """
+(function (selectors) {
+    const index = new Map(selectors.map(sel => [sel, new Set()]));
+    const check = (el) => {
+        for (const [sel, found] of index) {
+            if (el.matches(sel)) found.add(el);
+        }
+    };
+    const scan = (root) => {
+        check(root);
+        for (const [sel, found] of index) {
+            for (const el of root.querySelectorAll(sel)) found.add(el);
+        }
+    };
+    new MutationObserver(mutations => {
+        for (const m of mutations) {
+            if (m.type === 'attributes') {
+                check(m.target);
+            } else {
+                for (const node of m.addedNodes) {
+                    if (node.nodeType === Node.ELEMENT_NODE) scan(node);
+                }
+            }
+        }
+    }).observe(document, {
+        subtree: true, childList: true, attributes: true,
+        attributeFilter: ['id', 'class', 'name', 'type', 'min', 'aria-label', 'placeholder']
+    });
+    window.__scraperIndex = {
+        get(sel) {
+            const found = index.get(sel);
+            if (!found) return null;
+            const live = Array.from(found).filter(el => el.isConnected && el.matches(sel));
+            index.set(sel, new Set(live));
+            return live.sort(
+                (a, b) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1
+            );
+        }
+    };
+})
+"""
+
+# Selectors maintained by the element index
+_INDEXED_SELECTORS = _QUANTITY_CSS_TIERS
+
+# Reads one selector's matches from the element index; null if not installed
+_READ_ELEMENT_INDEX_JS = """
+return window.__scraperIndex ? window.__scraperIndex.get(arguments[0]) : null;
+"""
+
+# Text-based quantity fallbacks. With arguments[0] == 'sibling' returns inputs
+# next to a label/span mentioning quantity/qty; with 'ancestor' returns inputs
+# inside any div whose text mentions it. Results are in document order.
+_QUANTITY_NEAR_TEXT_JS = """
+const scope = arguments[0];
+const re = /quantity|qty/;
+const found = new Set();
+if (scope === 'sibling') {
+    for (const el of document.querySelectorAll('label, span')) {
+        if (!el.parentElement || !re.test(el.textContent.toLowerCase())) continue;
+        for (const sib of el.parentElement.children) {
+            if (sib !== el && sib.tagName === 'INPUT') found.add(sib);
+        }
+    }
+} else {
+    // An ancestor div's text is a superset of its descendants' text, so
+    // testing the outermost div ancestor is enough.
+    const tested = new Map();
+    for (const input of document.querySelectorAll('div input')) {
+        let outer = null;
+        for (let p = input.parentElement; p; p = p.parentElement) {
+            if (p.tagName === 'DIV') outer = p;
+        }
+        if (!tested.has(outer)) tested.set(outer, re.test(outer.textContent.toLowerCase()));
+        if (tested.get(outer)) found.add(input);
+    }
+}
+return Array.from(found).sort(
+    (a, b) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1
+);
+"""
+
+# Quantity "+" button selectors: class-based first, then "+" text
+_PLUS_BUTTON_XPATH_TIERS = (
+    (
+        "//button[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
+        "//a[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
+        "//span[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
+        "//div[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]"
+    ),
+    (
+        "//button[contains(text(), '+')]",
+        "//a[contains(text(), '+')]",
+        "//span[contains(text(), '+')]",
+        "//div[contains(text(), '+')]"
+    )
+)
+_PLUS_BUTTON_XPATH_UNIONS = tuple(" | ".join(tier) for tier in _PLUS_BUTTON_XPATH_TIERS)
+
+# Shared, read-only fallback used when no user data is supplied
+_DEFAULT_USER_DATA = types.MappingProxyType({
+    "email": "user@example.com",
+    "phone": "1234567890",
+    "first_name": "John",
+    "last_name": "Doe",
+    "address": types.MappingProxyType({
+        "street": "123 Main St",
+        "apt": "Apt 4B",
+        "city": "New York",
+        "state": "NY",
+        "zip": "10001",
+        "country": "United States"
+    }),
+    "payment_method": types.MappingProxyType({
+        "card_number": "4111111111111111",
+        "expiry_month": "12",
+        "expiry_year": "2025",
+        "cvv": "123"
+    })
+})
+
+# Inputs with modern styling patterns (Tailwind, Material, Chakra, ...), as one
+# combined query. The specific 'input.peer.w-full.h-full...' pattern is covered
+# by 'input.peer'.
+_MODERN_INPUT_SELECTOR = ", ".join((
+    "input.peer",
+    "input.text-blue-gray-700",
+    "input.bg-transparent",
+    "input.border-blue-gray-200",
+    'input[name="fullName"]',  # Specific selector for fullName
+    "input.placeholder-shown\\:border",
+    "input.focus\\:outline",
+    "input.transition-all",
+    "input.rounded-\\[7px\\]",
+    "input.w-full.h-full",
+    "input.code",
+    ".form-control",
+    ".form-input",
+    ".input-field",
+    ".chakra-input",
+    ".mui-input",
+    ".ant-input"
+))
+
+# Fills modern styled inputs from context; called with a flat user data object,
+# a debug flag and _MODERN_INPUT_SELECTOR
+_MODERN_INPUTS_JS = """
+(function (u, debug, modernInputSelector) {
+    const log = debug ? console.log.bind(console) : () => {};
+    
+    // Single-pass keyword scan; each capture group maps to a keyword class.
+    // Matches don't overlap, so a keyword sharing characters with an earlier
+    // match is not seen (e.g. 'phonemail' yields phone but not email)
+    const FIELD_PATTERN = /(name)|(email)|(telephone|phone|mobile)|(address 2|line 2)|(apt|suite)|(address)|(city)|(state|province|region)|(zip|postal)|(country)|(card)|(number)|(cvv|cvc|security code)|(expiry|expiration)/g;
+    const GROUP_KEYWORDS = [null, 'name', 'email', 'phone', 'line2', 'unit', 'address', 'city', 'state', 'zip', 'country', 'card', 'number', 'cvv', 'expiry'];
+    
+    // Helper function to determine field type from context
+    function determineFieldType(context) {
+        const found = new Set();
+        for (const match of context.toLowerCase().matchAll(FIELD_PATTERN)) {
+            found.add(GROUP_KEYWORDS[match.findIndex((group, i) => i > 0 && group !== undefined)]);
+        }
+        
+        // Resolve in the same priority order as the original branch chain
+        if (found.has('name')) return 'name';
+        if (found.has('email')) return 'email';
+        if (found.has('phone')) return 'phone';
+        if (found.has('address') && !found.has('line2')) return 'address';
+        if (found.has('line2') || found.has('unit')) return 'address2';
+        if (found.has('city')) return 'city';
+        if (found.has('state')) return 'state';
+        if (found.has('zip')) return 'zip';
+        if (found.has('country')) return 'country';
+        if (found.has('card') && found.has('number')) return 'cardnumber';
+        if (found.has('cvv')) return 'cvv';
+        if (found.has('expiry')) return 'expiry';
+        return 'unknown';
+    }
+    
+    // Value to fill for each field type; unknown types keep their current value
+    const FILLERS = {
+        name: () => u.first_name + ' ' + u.last_name,
+        email: () => u.email,
+        phone: () => u.phone,
+        address: () => u.street,
+        address2: () => u.apt,
+        city: () => u.city,
+        state: () => u.state,
+        zip: () => u.zip,
+        country: () => u.country,
+        cardnumber: () => u.card_number,
+        cvv: () => u.cvv,
+        expiry: () => u.expiry_month + '/' + u.expiry_year.slice(-2)
+    };
+    
+    function fillOne(input) {
+        if (input.type === 'hidden' || !input.offsetParent) return; // Skip hidden inputs
+        
+        // Get context from parent elements
+        let context = '';
+        let parent = input.parentElement;
+        for (let i = 0; i < 3 && parent; i++) { // Check up to 3 levels up
+            context += ' ' + (parent.textContent || '');
+            
+            // Also check for labels
+            const labels = parent.querySelectorAll('label');
+            for (const label of labels) {
+                context += ' ' + (label.textContent || '');
+            }
+            
+            parent = parent.parentElement;
+        }
+        
+        // Also check for aria-label and placeholder
+        context += ' ' + (input.getAttribute('aria-label') || '');
+        context += ' ' + (input.getAttribute('placeholder') || '');
+        context += ' ' + (input.name || '');
+        context += ' ' + (input.id || '');
+        
+        // Determine field type from context
+        const fieldType = determineFieldType(context);
+        if (debug) log(`Field type determined as: ${fieldType} for context: ${context.substring(0, 50)}...`);
+        
+        // Fill the field based on type
+        const filler = FILLERS[fieldType];
+        if (filler) {
+            input.value = filler();
+            log(`Filled ${fieldType} field`);
+        }
+        
+        // Trigger events to ensure the value is registered
+        input.dispatchEvent(new Event('input', { bubbles: true }));
+        input.dispatchEvent(new Event('change', { bubbles: true }));
+        
+        // For modern frameworks, we need to trigger a focus event first, then blur.
+        // Blur is dispatched synchronously so validation has run before the script returns.
+        input.dispatchEvent(new Event('focus', { bubbles: true }));
+        input.dispatchEvent(new Event('blur', { bubbles: true }));
+    }
+    
+    // modernInputSelector is one combined query, so each input is visited and filled once
+    
+    try {
+        const inputs = document.querySelectorAll(modernInputSelector);
+        log(`Found ${inputs.length} modern styled inputs`);
+        inputs.forEach(fillOne);
+    } catch (e) {
+        console.error('Error filling modern styled inputs:', e);
+    }
+})
+"""
+
+_REACT_SELECT_INPUT_SELECTOR = "[id^='react-select'][id$='-input']"
+
+# Elements matching CSS selector arguments[0] that are displayed and enabled,
+# filtered in the page rather than with two round-trips per element
+_VISIBLE_ENABLED_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).filter(el =>
+    !el.disabled
+    && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden');
+"""
+
+# Counts the widgets scrape_page's form helpers act on, so helpers with
+# nothing to do on the page can be skipped; only unchecked checkboxes count,
+# as the agreement handler never touches checked ones
+_WIDGET_PROBE_JS = """
+return {
+    checkboxes: document.querySelectorAll('input[type=checkbox]:not(:checked)').length,
+    react_selects: document.querySelectorAll(arguments[0]).length,
+    modern_inputs: document.querySelectorAll(arguments[1]).length
+};
+"""
+
+# Product option selectors, grouped into priority tiers. Each tier is a single
+# XPath union template filled with ${name}, ${value} and ${value_lower}.
+_OPTION_XPATH_TIERS = (
+    # Modern UI selectors
+    (
+        "//button[@role='option']//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]/ancestor::button",
+        "//*[@role='option' and descendant::*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]]",
+        "//button[descendant::*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]]"
+    ),
+    # Direct element selectors
+    (
+        "//select[contains(@id, '${name}') or contains(@name, '${name}') or contains(@class, '${name}')]",
+        "//div[contains(@class, 'product-options')]//select[contains(@id, '${name}')]",
+        "//div[contains(@class, 'variant')]//select[contains(@id, '${name}')]",
+        "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${name}')]",
+        "//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value}')]"
+    ),
+    # Button and div selectors with expanded attributes
+    (
+        "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]",
+        "//button[@role='option']//span[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]/ancestor::button",
+        "//button[.//span[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]]",
+        "//div[contains(@class, 'variant')]//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]"
+    ),
+    # Role-based selectors
+    (
+        "//*[@role='option' and contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]",
+        "//*[@role='option']//span[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value_lower}')]/ancestor::*[@role='option']"
+    ),
+    # Radio button selectors
+    (
+        "//input[@type='radio' and (contains(@name, '${name}') or contains(@class, '${name}') or contains(@value, '${value}'))]",
+        "//input[@type='radio' and contains(text(), '${value}')]"
+    ),
+    # Custom attribute selectors
+    (
+        "//*[@data-${name}='${value}']",
+        "//*[@data-variant='${value}']",
+        "//*[@data-option='${value}']",
+        "//*[@data-selection='${value}']"
+    ),
+    # Nested selectors for complex structures
+    (
+        "//div[contains(@class, 'variant-wrapper')]//div[contains(., '${value}')]",
+        "//div[contains(@class, 'swatch')]//div[contains(., '${value}')]",
+        "//div[contains(@class, 'option')]//div[contains(., '${value}')]"
+    ),
+    # Fallback selectors
+    (
+        "//*[contains(@option-value, '${value}') or contains(@data-option-value, '${value}') or contains(@value, '${value}')]",
+        "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '${value}')]"
+    )
+)
+_OPTION_XPATH_TEMPLATES = tuple(Template(" | ".join(tier)) for tier in _OPTION_XPATH_TIERS)
+
+# Button types that submit payment; only these get the remember-checkbox and
+# payment error handling in find_and_click_button
+_PAYMENT_BUTTON_TYPES = frozenset({'payment', 'complete_order'})
+
+# Semantic hooks the major storefronts (Shopify, WooCommerce, headless themes)
+# put on their buttons; tried before the generic matchers below
+_BUTTON_FAST_PATH_CSS = {
+    'add_to_cart': "button[name='add'], button.single_add_to_cart_button, button[data-testid*='add-to-cart'], #AddToCart",
+    'checkout': "button[name='checkout'], input[name='checkout'], button[data-testid*='checkout'], a.checkout-button",
+    'view_cart': "a.added_to_cart.wc-forward, a[data-testid*='view-cart']",
+    'payment': "#checkout-pay-button, button[data-testid*='pay-button'], button#continue_button",
+    'complete_order': "#place_order, button[name='commit'], button[data-testid*='place-order']"
+}
+
+# Button matchers by button type, most specific first. ("text", tag, keyword)
+# and ("value", tag, keyword) match lowercase keywords against an element's
+# text content or value attribute; ("xpath", expr) and ("css", selector) are
+# evaluated as is.
+_BUTTON_MATCHERS = {
+    'add_to_cart': (
+        ("text", "button", "add to cart"),
+        ("text", "a", "add to cart"),
+        ("value", "input", "add to cart"),
+        ("xpath", "//*[contains(@id, 'add-to-cart') or contains(@class, 'add-to-cart')]"),
+        ("xpath", "//*[contains(@id, 'addtocart') or contains(@class, 'addtocart')]")
+    ),
+    'checkout': (
+        ("text", "button", "checkout"),
+        ("text", "a", "checkout"),
+        ("value", "input", "checkout"),
+        ("xpath", "//*[contains(@id, 'checkout') or contains(@class, 'checkout')]"),
+        ("text", "button", "proceed to"),
+        ("text", "a", "proceed to")
+    ),
+    'view_cart': (
+        ("text", "button", "view cart"),
+        ("text", "a", "view cart"),
+        ("value", "input", "view cart"),
+        ("xpath", "//*[contains(@id, 'view-cart') or contains(@class, 'view-cart')]"),
+        ("xpath", "//*[contains(@id, 'viewcart') or contains(@class, 'viewcart')]"),
+        ("xpath", "//a[contains(@href, 'cart')]")
+    ),
+    'payment': (
+        ("text", "button", "pay"),
+        ("text", "a", "pay"),
+        ("text", "button", "continue"),
+        ("text", "a", "continue"),
+        ("xpath", "//*[contains(@id, 'pay') or contains(@class, 'pay')]"),
+    ),
+    'complete_order': (
+        ("text", "button", "place order"),
+        ("text", "button", "complete order"),
+        ("text", "button", "submit order"),
+        ("text", "a", "place order"),
+        ("value", "input", "place order"),
+        ("xpath", "//*[contains(@id, 'place-order') or contains(@class, 'place-order')]"),
+        ("xpath", "//*[contains(@id, 'placeorder') or contains(@class, 'placeorder')]")
+    )
+}
+
+# Evaluates groups of {type, matchers} in one pass and returns every visible
+# match as {type, selector, element, text, value}, in group and matcher
+# priority order. Buttons, links and inputs are collected in a single DOM walk
+# and each one's text/value is lowercased at most once, instead of a
+# translate() per node per XPath. An element matched several times is only
+# reported for the first matcher.
+_FIND_VISIBLE_FN_JS = """
+(function (groups) {
+    const byTag = { button: [], a: [], input: [] };
+    for (const el of document.querySelectorAll('button, a, input')) {
+        byTag[el.tagName.toLowerCase()].push(el);
+    }
+    const lowered = new Map();
+    const lower = (el, kind) => {
+        let entry = lowered.get(el);
+        if (!entry) {
+            entry = {};
+            lowered.set(el, entry);
+        }
+        if (entry[kind] === undefined) {
+            const raw = kind === 'text' ? el.textContent : el.getAttribute('value');
+            entry[kind] = (raw || '').toLowerCase();
+        }
+        return entry[kind];
+    };
+    const matching = (matcher) => {
+        if (matcher[0] === 'css') {
+            try {
+                return Array.from(document.querySelectorAll(matcher[1]));
+            } catch (e) {
+                return [];
+            }
+        }
+        if (matcher[0] === 'xpath') {
+            let snapshot;
+            try {
+                snapshot = document.evaluate(matcher[1], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            } catch (e) {
+                return [];
+            }
+            const els = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) {
+                els.push(snapshot.snapshotItem(i));
+            }
+            return els;
+        }
+        return (byTag[matcher[1]] || []).filter(el => lower(el, matcher[0]).includes(matcher[2]));
+    };
+    const seen = new Set();
+    const found = [];
+    for (const group of groups) {
+        for (const matcher of group.matchers) {
+            for (const el of matching(matcher)) {
+                if (seen.has(el)) continue;
+                seen.add(el);
+                const displayed = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+                    && getComputedStyle(el).visibility !== 'hidden';
+                if (!displayed) continue;
+                found.push({
+                    type: group.type,
+                    selector: matcher.join(' '),
+                    element: el,
+                    text: (el.innerText || '').trim().slice(0, 80),
+                    value: el.value || ''
+                });
+            }
+        }
+    }
+    return found;
+})
+"""
+
+# Registered once per document so each call only ships a one-line script
+_INSTALL_FIND_VISIBLE_JS = "window.__scraperFindVisible = " + _FIND_VISIBLE_FN_JS.strip() + ";"
+
+# Calls the registered finder; null if it is not installed in this document
+_CALL_FIND_VISIBLE_JS = """
+if (!window.__scraperFindVisible) return null;
+return window.__scraperFindVisible(arguments[0]);
+"""
+
+# Self-contained finder for documents without the registered helper
+_FIND_VISIBLE_JS = "return " + _FIND_VISIBLE_FN_JS.strip() + "(arguments[0]);"
+
+# Text of the most specific visible payment error on the page, or null. One
+# class query and one text-node walk replace an XPath evaluation per probe;
+# ranks keep the old probe order: error/alert divs whose own text names a
+# payment keyword, then any error/alert div, error paragraphs and spans, and
+# last any element whose own text holds a known failure phrase
+_PAYMENT_ERROR_TEXT_JS = """
+const keywords = ['payment', 'card', 'declined', 'failed'];
+const phrases = ['payment declined', 'card declined', 'payment failed', 'transaction failed', 'invalid card'];
+const phraseRank = 2 * keywords.length + 4;
+let best = null;
+let bestRank = Infinity;
+
+function ownText(el) {
+    let text = '';
+    for (const node of el.childNodes) {
+        if (node.nodeType === Node.TEXT_NODE) text += node.data + ' ';
+    }
+    return text;
+}
+
+function consider(el, rank) {
+    if (rank >= bestRank) return;
+    const displayed = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+        && getComputedStyle(el).visibility !== 'hidden';
+    if (!displayed) return;
+    const text = (el.innerText || '').trim();
+    if (text) {
+        best = text;
+        bestRank = rank;
+    }
+}
+
+const classed = document.querySelectorAll(
+    'div[class*="error"], div[class*="alert"], p[class*="error"], span[class*="error"]'
+);
+for (const el of classed) {
+    const isError = (el.getAttribute('class') || '').includes('error');
+    let rank;
+    if (el.tagName === 'DIV') {
+        const own = ownText(el);
+        const k = keywords.findIndex(word => own.includes(word));
+        rank = k >= 0
+            ? 2 * k + (isError ? 0 : 1)
+            : 2 * keywords.length + (isError ? 0 : 1);
+    } else {
+        rank = 2 * keywords.length + (el.tagName === 'P' ? 2 : 3);
+    }
+    consider(el, rank);
+}
+
+if (best === null && document.body) {
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const j = phrases.findIndex(phrase => node.data.includes(phrase));
+        if (j >= 0 && node.parentElement) consider(node.parentElement, phraseRank + j);
+    }
+}
+return best;
+"""
+
+# _PAYMENT_ERROR_TEXT_JS as an expression for Runtime.evaluate
+_PAYMENT_ERROR_TEXT_EXPR = "(() => {" + _PAYMENT_ERROR_TEXT_JS + "})()"
+
+# Runs automation code from execute_action with arguments[0] as the user data
+# and a safeUserData copy with empty strings for missing fields; also marks
+# when the action finished and whether it started a navigation, for
+# _wait_after_action. The action code goes where the marker comment is
+_ACTION_WRAPPER_JS = """
+const userData = arguments[0];
+
+// Add null checks for all user data properties
+const safeUserData = {
+    email: userData.email || '',
+    first_name: userData.first_name || '',
+    last_name: userData.last_name || '',
+    phone: userData.phone || '',
+    address: {
+        street: (userData.address && userData.address.street) || '',
+        apt: (userData.address && userData.address.apt) || '',
+        city: (userData.address && userData.address.city) || '',
+        state: (userData.address && userData.address.state) || '',
+        zip: (userData.address && userData.address.zip) || '',
+        country: (userData.address && userData.address.country) || ''
+    },
+    payment_method: {
+        card_number: (userData.payment_method && userData.payment_method.card_number) || '',
+        expiry_month: (userData.payment_method && userData.payment_method.expiry_month) || '',
+        expiry_year: (userData.payment_method && userData.payment_method.expiry_year) || '',
+        cvv: (userData.payment_method && userData.payment_method.cvv) || ''
+    }
+};
+
+// Log that we're using the data (will appear in browser console)
+console.log('Using user data:', {
+    email: safeUserData.email,
+    name: safeUserData.first_name + ' ' + safeUserData.last_name,
+    address: safeUserData.address.city + ', ' + safeUserData.address.state,
+    payment: safeUserData.payment_method.card_number ? ('****' + safeUserData.payment_method.card_number.slice(-4)) : ''
+});
+
+// Let execute_action see when the action finished and whether it navigated
+window.__actionDone = undefined;
+window.__actionNavigating = false;
+window.addEventListener('beforeunload', () => { window.__actionNavigating = true; }, { once: true });
+
+// Execute the automation code with both userData and safeUserData available
+try {
+/* action code */
+} catch (error) {
+    console.error('Error executing automation code:', error);
+    // Try to continue despite errors
+}
+
+window.__actionDone = performance.now();
+"""
+
+# Halves of _ACTION_WRAPPER_JS around the action code, split once
+_ACTION_PREFIX_JS, _, _ACTION_SUFFIX_JS = _ACTION_WRAPPER_JS.partition("/* action code */")
+
+# Words in a checkbox's id, name or class that mark it as an agreement
+_AGREEMENT_WORDS = ("agree", "consent", "confirm", "accept", "terms")
+
+# Unchecked checkboxes that aren't a newsletter signup. :checked reflects
+# the live state rather than the authored checked attribute, and the i flag
+# matches the id and name case-insensitively, so "Newsletter" and
+# "SUBSCRIBE" are excluded without listing each spelling
+_NON_NEWSLETTER_CHECKBOX_CSS = (
+    "input[type='checkbox']:not(:checked)"
+    ":not([id*='newsletter' i]):not([name*='newsletter' i])"
+    ":not([id*='subscribe' i]):not([name*='subscribe' i])"
+)
+
+# Agreement checkboxes by id, name or class, cookie consent checkboxes, and
+# any other unchecked checkbox that isn't a newsletter signup. Every clause
+# only tests attributes and state, so the whole union is one CSS selector list for the
+# browser's selector engine instead of a document-wide XPath walk. Boxes
+# that are already checked are left out by the selector itself
+_AGREEMENT_CHECKBOX_CSS = ", ".join(
+    [f"input[type='checkbox'][{attr}*='{word}']:not(:checked)"
+     for attr in ("id", "name", "class") for word in _AGREEMENT_WORDS]
+    + [f"input[type='checkbox'][{attr}*='cookie']:not(:checked)" for attr in ("id", "name", "class")]
+    + [_NON_NEWSLETTER_CHECKBOX_CSS]
+)
+
+# Agreement checkboxes by id, name or class that are already checked
+_CHECKED_AGREEMENT_CHECKBOX_CSS = ", ".join(
+    f"input[type='checkbox'][{attr}*='{word}']:checked" for attr in ("id", "name", "class") for word in _AGREEMENT_WORDS
+)
+
+# Whether any element matches the selector in arguments[0]
+_HAS_MATCH_JS = "return !!document.querySelector(arguments[0]);"
+
+# Checks every visible, unchecked agreement checkbox and returns their label
+# texts (its first associated label, then the parent's text), in one call. Candidates
+# are the matches of the selector list passed in, then checkboxes inside,
+# before or after a label whose text mentions an agreement, then checkboxes
+# inside a div whose text mentions agreeing or terms. Label and div texts are
+# lowercased once each instead of translate()d by XPath per node.
+_CHECK_AGREEMENT_BOXES_FN_JS = """
+(function (selector) {
+    // Nothing to do without an unchecked checkbox; skips the text walks below
+    if (!document.querySelector('input[type="checkbox"]:not(:checked)')) return [];
+
+    const labelWords = ['agree', 'consent', 'confirm', 'accept', 'terms'];
+    const divWords = ['agree', 'terms'];
+    const mentions = (el, words) => {
+        const text = el.textContent.toLowerCase();
+        return words.some(word => text.includes(word));
+    };
+    const isCheckbox = (el) => el.tagName === 'INPUT' && el.getAttribute('type') === 'checkbox';
+
+    const byAttributes = Array.from(document.querySelectorAll(selector));
+
+    const inLabel = [];
+    const beforeLabel = [];
+    const afterLabel = [];
+    for (const label of document.getElementsByTagName('label')) {
+        if (!mentions(label, labelWords)) continue;
+        for (const child of label.children) {
+            if (isCheckbox(child)) inLabel.push(child);
+        }
+        for (let sib = label.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (isCheckbox(sib)) beforeLabel.push(sib);
+        }
+        for (let sib = label.nextElementSibling; sib; sib = sib.nextElementSibling) {
+            if (isCheckbox(sib)) afterLabel.push(sib);
+        }
+    }
+
+    // Each element once, in match order; boxes already matched skip the
+    // div walk below, which reads the most text
+    const candidates = new Set([...byAttributes, ...inLabel, ...beforeLabel, ...afterLabel]);
+
+    // Whether each div mentions the words, so shared ancestors are read once
+    const divMentions = new Map();
+    for (const box of document.querySelectorAll('input[type="checkbox"]')) {
+        if (candidates.has(box)) continue;
+        for (let el = box.parentElement; el; el = el.parentElement) {
+            if (el.tagName !== 'DIV') continue;
+            if (!divMentions.has(el)) divMentions.set(el, mentions(el, divWords));
+            if (divMentions.get(el)) {
+                candidates.add(box);
+                break;
+            }
+        }
+    }
+
+    // Read visibility and labels of every candidate before clicking any, so
+    // layout is computed once instead of again after each click
+    const targets = [];
+    for (const el of candidates) {
+        if (el.checked) continue;
+        const displayed = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+            && getComputedStyle(el).visibility !== 'hidden';
+        if (!displayed) continue;
+        // The input's own label association covers label[for] and wrapping labels
+        const labelEl = el.labels && el.labels[0];
+        let label = labelEl ? (labelEl.innerText || '').trim() : '';
+        if (!label && el.parentElement) label = (el.parentElement.innerText || '').trim();
+        // Boxes already in the viewport are clicked without scrolling, so
+        // the loop below doesn't force a layout for each of them
+        const rect = el.getBoundingClientRect();
+        const inView = rect.top >= 0 && rect.left >= 0
+            && rect.bottom <= window.innerHeight && rect.right <= window.innerWidth;
+        targets.push([el, label || 'Unknown', inView]);
+    }
+
+    const checked = [];
+    for (const [el, label, inView] of targets) {
+        // An earlier click may have checked this box already
+        if (el.checked) continue;
+        if (!inView) el.scrollIntoView({block: 'center'});
+        el.click();
+        checked.push(label);
+    }
+    return checked;
+})
+"""
+
+# Registered once per document so each call only ships a one-line script
+_INSTALL_CHECK_AGREEMENT_JS = "window.__scraperCheckAgreement = " + _CHECK_AGREEMENT_BOXES_FN_JS.strip() + ";"
+
+# Calls the registered checker; null if it is not installed in this document
+_CALL_CHECK_AGREEMENT_JS = """
+if (!window.__scraperCheckAgreement) return null;
+return window.__scraperCheckAgreement(arguments[0]);
+"""
+
+# Self-contained checker for documents without the registered helper
+_CHECK_AGREEMENT_BOXES_JS = "return " + _CHECK_AGREEMENT_BOXES_FN_JS.strip() + "(arguments[0]);"
+
+# Fills the detected checkout fields in one pass. arguments[0] is the user
+# data and arguments[1] the field types from detect_form_fields, so the
+# script text is the same on every call; returns the number of fields filled
+_FILL_SCRIPT = """
+const userData = arguments[0];
+const fieldTypes = arguments[1];
+let filledFields = 0;
+
+// User data for a field role: a dotted path into userData, or full_name;
+// each role is resolved once per call however many fields share it
+const roleValues = new Map();
+function valueForRole(role) {
+    if (!roleValues.has(role)) {
+        roleValues.set(role, role === 'full_name'
+            ? userData.first_name + ' ' + userData.last_name
+            : role.split('.').reduce((obj, key) => (obj == null ? undefined : obj[key]), userData));
+    }
+    return roleValues.get(role);
+}
+
+// Shipping input roles by lowercased name/id, first match wins; address2/apt
+// is tested before address so secondary address lines get the apartment
+const SHIPPING_ROLE_PATTERNS = [
+    [/first|^(?!.*last).*name/, 'first_name'],
+    [/last/, 'last_name'],
+    [/address2|apt/, 'address.apt'],
+    [/address|street/, 'address.street'],
+    [/city/, 'address.city'],
+    [/state|province/, 'address.state'],
+    [/zip|postal/, 'address.zip'],
+    [/country/, 'address.country']
+];
+
+function shippingRole(name) {
+    for (const [pattern, role] of SHIPPING_ROLE_PATTERNS) {
+        if (pattern.test(name)) return role;
+    }
+    return null;
+}
+
+// Looks up a field record from detect_form_fields by id, then by name
+function resolveField(rec) {
+    return document.getElementById(rec.id) || document.getElementsByName(rec.name)[0] || null;
+}
+
+// Helper function to fill an input field with enhanced framework support;
+// target is either a field record or an element
+function fillField(target, value) {
+    const field = target.nodeType ? target : resolveField(target);
+    if (field) {
+        if (field.tagName === 'SELECT') {
+            // Handle select fields
+            const options = field.options;
+            const valueToMatch = value.toLowerCase();
+            for (let i = 0; i < options.length; i++) {
+                const optionText = options[i].text.toLowerCase();
+                const optionValue = options[i].value.toLowerCase();
+                
+                if (optionText.includes(valueToMatch) || optionValue.includes(valueToMatch)) {
+                    field.selectedIndex = i;
+                    field.dispatchEvent(new Event('change', { bubbles: true }));
+                    filledFields++;
+                    return true;
+                }
+            }
+            return false;
+        } else {
+            // Enhanced input field handling
+            try {
+                // Try to clear any existing value trackers (React)
+                if (field._valueTracker) {
+                    field._valueTracker.setValue('');
+                }
+                
+                // Use native input value setter for framework compatibility
+                const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+                nativeInputValueSetter.call(field, value);
+                
+                // Dispatch multiple events for framework detection
+                field.dispatchEvent(new Event('input', { bubbles: true }));
+                field.dispatchEvent(new Event('change', { bubbles: true }));
+                field.dispatchEvent(new Event('blur', { bubbles: true }));
+                
+                filledFields++;
+                return true;
+            } catch (e) {
+                console.error('Error filling field:', e);
+                // Fallback to basic value setting
+                field.value = value;
+                field.dispatchEvent(new Event('input', { bubbles: true }));
+                field.dispatchEvent(new Event('change', { bubbles: true }));
+                filledFields++;
+                return true;
+            }
+        }
+    }
+    return false;
+}
+
+// Enhanced email field detection
+const emailSelectors = [
+    'input[name="email"]',
+    'input[type="email"]',
+    'input[autocomplete="email"]',
+    'input.email',
+    'input#email'
+];
+
+let emailField = null;
+for (const selector of emailSelectors) {
+    emailField = document.querySelector(selector);
+    if (emailField) {
+        console.log(`Found email input using selector: ${selector}`);
+        fillField(emailField, userData.email);
+        break;
+    }
+}
+
+// Enhanced name field handling
+const nameSelectors = [
+    'input[name="fullName"]',
+    'input[name="full_name"]',
+    'input[name="name"]',
+    'input[autocomplete="name"]',
+    'input.full-name',
+    'input#fullName',
+    'input#full_name',
+    'input#name'
+];
+
+let nameField = null;
+for (const selector of nameSelectors) {
+    nameField = document.querySelector(selector);
+    if (nameField) {
+        console.log(`Found name input using selector: ${selector}`);
+        fillField(nameField, userData.first_name + ' ' + userData.last_name);
+        break;
+    }
+}
+
+// Fill billing fields by the role detect_form_fields assigned them
+for (const rec of fieldTypes.billing || []) {
+    if (rec.role) fillField(rec, valueForRole(rec.role));
+}
+
+// Find shipping form container: the first form/div/section/fieldset in
+// document order whose text mentions shipping. Every ancestor of a match
+// matches too, so that is the outermost container around the first text node
+// that mentions it; one pass over text nodes instead of reading textContent
+// of every container.
+function findShippingForm() {
+    if (!document.body) return null;
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const text = node.data.toLowerCase();
+        if (!(text.includes('shipping') || text.includes('ship to') || text.includes('delivery'))) continue;
+        let outermost = null;
+        for (let el = node.parentElement; el; el = el.parentElement) {
+            if (el.matches('form, div, section, fieldset')) outermost = el;
+        }
+        if (outermost) return outermost;
+    }
+    return null;
+}
+const shippingForm = findShippingForm();
+
+if (shippingForm) {
+    // Find all input elements within shipping form
+    const inputs = shippingForm.querySelectorAll('input, select, textarea');
+    
+    for (const input of inputs) {
+        const inputName = (input.name || input.id || '').toLowerCase();
+        
+        const role = shippingRole(inputName);
+        if (role) fillField(input, valueForRole(role));
+    }
+}
+
+// Fill contact fields
+for (const rec of fieldTypes.contact || []) {
+    if (rec.role) fillField(rec, valueForRole(rec.role));
+}
+
+// Check "same as shipping" checkbox if billing is same as shipping
+for (const rec of fieldTypes.same_as_shipping || []) {
+    const checkbox = resolveField(rec);
+    if (checkbox) {
+        checkbox.checked = true;
+        checkbox.dispatchEvent(new Event('change', { bubbles: true }));
+        filledFields++;
+    }
+}
+
+// Set full name and email once more through the framework-aware setter
+// registered on every document (_install_set_input_helper), for frameworks
+// that reset them after the first fill
+const setInput = window.__scraperSetInput;
+if (setInput) {
+    const fullNameField = document.querySelector('input[name="fullName"]');
+    const contactEmailField = document.querySelector('input[name="email"]') ||
+        document.querySelector('input[type="email"]');
+    if (fullNameField) setInput(fullNameField, userData.first_name + ' ' + userData.last_name, false);
+    if (contactEmailField) setInput(contactEmailField, userData.email, false);
+}
+
+return filledFields;
+"""
+
+# Iframes that may host card fields (Stripe Elements, Shopify card fields)
+_PAYMENT_IFRAME_CSS = "iframe[name^='__privateStripeFrame'], iframe.stripe-element, iframe.card-fields-iframe"
+
+# Card field selectors inside a payment iframe, in fill priority order
+_PAYMENT_FRAME_FIELD_CSS = {
+    'card': "input[name='number'], input[name='cardnumber'], input[autocomplete='cc-number'],input[data-elements-stable-field-name='cardNumber']",
+    'expiry': "input[name='exp-date'], input[name='expiry'], input[data-elements-stable-field-name='cardExpiry'], input[autocomplete='cc-exp']",
+    'cvv': "input[name='verification_value'], input[name='cvc'], input[autocomplete='cc-csc'], input[data-elements-stable-field-name='cardCvc']",
+    'name': "input[name='name'], input[name='cardholder-name'], input[name='cardholder'], input[name='nameOnAccount'], input[data-elements-stable-field-name='cardHolder'], input[autocomplete='cc-name']"
+}
+
+# Maps each field type in arguments[0] ({type: css}) to its first match in the
+# current frame, or null, in one call per frame
+_FRAME_FIELDS_JS = """
+const found = {};
+for (const [type, selector] of Object.entries(arguments[0])) {
+    found[type] = document.querySelector(selector);
+}
+return found;
+"""
+
+# Scrolls to, focuses, clears and fills a payment iframe field with
+# arguments[1], then blurs it, in one call. The native setter keeps
+# framework-controlled inputs (Stripe Elements) in sync with the new value.
+_FILL_FRAME_FIELD_JS = """
+const el = arguments[0];
+el.scrollIntoView({block: 'center'});
+el.focus();
+el.click();
+const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+nativeInputValueSetter.call(el, '');
+nativeInputValueSetter.call(el, arguments[1]);
+el.dispatchEvent(new Event('input', { bubbles: true }));
+el.dispatchEvent(new Event('change', { bubbles: true }));
+// Move focus to body element after setting value
+document.body.focus();
+el.dispatchEvent(new Event('blur', { bubbles: true }));
+"""
+
+# True once the field in arguments[0] holds the value in arguments[1], ignoring
+# the spaces and slashes payment widgets insert while formatting
+_FRAME_FIELD_FILLED_JS = """
+const strip = (value) => String(value).replace(/[^0-9a-z]/gi, '');
+return strip(arguments[0].value) === strip(arguments[1]);
+"""
+
+# Lowercase phrases that mark a JavaScript alert as a payment error
+_ALERT_ERROR_KEYWORDS = (
+    "invalid payment", "payment failed", "payment error",
+    "system error", "error", "failed", "declined",
+    "invalid card", "card declined", "transaction failed"
+)
+
+# Any of _ALERT_ERROR_KEYWORDS, matched case-insensitively in one scan
+_ALERT_ERROR_RE = re.compile("|".join(map(re.escape, _ALERT_ERROR_KEYWORDS)), re.IGNORECASE)
+
+# Scrolls arguments[0] into view and clicks it, in one call
+_SCROLL_AND_CLICK_JS = """
+arguments[0].scrollIntoView({block: 'center'});
+arguments[0].click();
+"""
+
+# Flags a payment error for execute_action to pick up; the message is passed
+# as an argument so the script text never changes and quotes can't break it
+_RECORD_PAYMENT_ERROR_JS = """
+console.error('Payment error alert detected:', arguments[0]);
+window.paymentErrorDetected = arguments[0];
+"""
+
+# Unchecks every visible, checked "Remember me" / "Save information" checkbox
+# and returns their label texts (label[for] first, then the parent's text).
+# One walk over the page's checkboxes: a box qualifies if its id, name or
+# class mentions remember/save/store, or a wrapping <label> mentions
+# remember/save. Labels are only read for boxes that are actually unchecked.
+_UNCHECK_REMEMBER_JS = """
+const attrPattern = /remember|save|store/;
+const labelPattern = /remember|save/;
+const labels = [];
+for (const el of document.querySelectorAll('input[type=checkbox]')) {
+    if (!el.checked) continue;
+    const attrs = (el.id + ' ' + (el.getAttribute('name') || '') + ' ' + (el.getAttribute('class') || '')).toLowerCase();
+    const wrapping = el.closest('label');
+    if (!attrPattern.test(attrs) && !(wrapping && labelPattern.test(wrapping.textContent.toLowerCase()))) continue;
+    const displayed = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+        && getComputedStyle(el).visibility !== 'hidden';
+    if (!displayed) continue;
+    // The input's own label association instead of a document-wide label[for] query
+    const labelEl = el.labels && el.labels[0];
+    let label = labelEl ? (labelEl.innerText || '').trim() : '';
+    if (!label && el.parentElement) label = (el.parentElement.innerText || '').trim();
+    el.click();
+    labels.push(label || 'Unknown');
+}
+return labels;
+"""
+
+# id, name, class, placeholder, label text and tag of every form control, in
+# one call instead of several attribute reads and a label lookup per control.
+# The controls are summarised in a signature (URL, count, ids and names);
+# returns null when it equals arguments[0], the signature of the last
+# detection, else {signature, fields}
+_FORM_FIELDS_JS = """
+const controls = document.querySelectorAll('input, select, textarea');
+let key = location.href + '|' + controls.length;
+for (const el of controls) key += '|' + el.id + '/' + (el.getAttribute('name') || '');
+let hash = 5381;
+for (let i = 0; i < key.length; i++) hash = ((hash * 33) ^ key.charCodeAt(i)) >>> 0;
+const signature = controls.length + ':' + hash.toString(36);
+if (signature === arguments[0]) return null;
+
+const fields = Array.from(controls).map(el => {
+    const id = el.id || '';
+    let label = '';
+    if (id) {
+        const labelEl = document.querySelector('label[for="' + CSS.escape(id) + '"]');
+        if (labelEl) label = (labelEl.innerText || '').trim();
+    }
+    return {
+        id: id,
+        name: el.getAttribute('name') || '',
+        cls: el.getAttribute('class') || '',
+        ph: el.getAttribute('placeholder') || '',
+        label: label,
+        tag: el.tagName.toLowerCase()
+    };
+});
+return { signature: signature, fields: fields };
+"""
+
+# Substrings of a field's id/name/class/placeholder/label that identify its type
+_FIELD_IDENTIFIERS = {
+    "billing": ("billing", "bill to", "bill address", "billing address", "bill information"),
+    "shipping": ("shipping", "ship to", "delivery", "shipping address", "ship address", "delivery address", "recipient"),
+    "payment": ("payment", "card", "credit", "cvv", "cvc", "expir", "expiry", "expiration", "card number", "cardholder", "security code", "payment method"),
+    "contact": ("email", "phone", "contact", "mobile", "telephone", "e-mail", "customer", "account")
+}
+
+# Which user data a billing/contact field takes, decided from its id and name:
+# (role, any of these substrings, none of these), first match wins. Roles are
+# dotted paths into user_data, plus full_name for first and last combined.
+_FIELD_ROLE_RULES = {
+    "billing": (
+        ("full_name", ("full_name",), ()),
+        ("full_name", ("name",), ("first", "last", "user")),
+        ("first_name", ("first",), ()),
+        ("first_name", ("name",), ("last",)),
+        ("last_name", ("last",), ()),
+        ("address.apt", ("address2", "apt"), ()),
+        ("address.street", ("address", "street"), ()),
+        ("address.city", ("city",), ()),
+        ("address.state", ("state", "province"), ()),
+        ("address.zip", ("zip", "postal"), ()),
+        ("address.country", ("country",), ())
+    ),
+    "contact": (
+        ("email", ("email",), ()),
+        ("phone", ("phone",), ())
+    )
+}
+
+# One alternation per field type, so classifying a field is a scan per type
+# rather than a substring search per identifier
+_FIELD_IDENTIFIER_RES = {
+    field_type: re.compile("|".join(map(re.escape, identifiers)))
+    for field_type, identifiers in _FIELD_IDENTIFIERS.items()
+}
+
+# Keyword -> field type for React Select dropdowns, matched in a single regex scan
+_SELECT_FIELD_KEYWORDS = {
+    "country": "country",
+    "state": "state",
+    "province": "state",
+    "region": "state"
+}
+_SELECT_FIELD_RE = re.compile("|".join(_SELECT_FIELD_KEYWORDS))
+
+_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+}
+
+# Script bundles that indicate the page is rendered client-side and needs Selenium
+_JS_APP_MARKER_RE = re.compile(r'<script[^>]+src="[^"]*(react|vue|angular|_next|nuxt)[^"]*"', re.IGNORECASE)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP/2 client so connections are reused across scrapes."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(http2=True, timeout=10, headers=_HTTP_HEADERS, follow_redirects=True)
+    return _http_client
+
+def pin_chromedriver_path() -> Optional[str]:
+    """Resolve chromedriver once and record its path for initialize_driver.
+    
+    Meant to run at service startup so that WebDriver Manager's metadata
+    reads and version-manifest requests never happen while scraping.
+    
+    Returns:
+        The pinned chromedriver path, or None if it could not be resolved
+    """
+    try:
+        driver_path = ChromeDriverManager(cache_valid_range=30).install()
+        os.makedirs(os.path.dirname(CHROMEDRIVER_PATH_FILE), exist_ok=True)
+        with open(CHROMEDRIVER_PATH_FILE, "w") as f:
+            f.write(driver_path)
+        logger.info(f"Pinned chromedriver path {driver_path} in {CHROMEDRIVER_PATH_FILE}")
+        return driver_path
+    except Exception as e:
+        logger.warning(f"Could not pin chromedriver path: {e}")
+        return None
+
+def _read_pinned_chromedriver_path() -> Optional[str]:
+    """Read the chromedriver path written by pin_chromedriver_path, if usable."""
+    try:
+        with open(CHROMEDRIVER_PATH_FILE) as f:
+            driver_path = f.read().strip()
+    except OSError:
+        return None
+    return driver_path if driver_path and os.access(driver_path, os.X_OK) else None
+
+_chrome_versions: Dict[str, Optional[str]] = {}
+
+async def _detect_chrome_version(chrome_binary_path: str) -> Optional[str]:
+    """Detect the installed Chrome version without blocking the event loop.
+    
+    The result is cached per binary, so only the first scraper in a process
+    pays for the subprocess.
+    """
+    if chrome_binary_path in _chrome_versions:
+        return _chrome_versions[chrome_binary_path]
+    
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            chrome_binary_path, "--version",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        out, _ = await proc.communicate()
+        chrome_version = out.decode().strip().split()[-1]
+        logger.info(f"Detected Chrome version: {chrome_version}")
+    except Exception as e:
+        logger.warning(f"Could not detect Chrome version: {e}")
+        chrome_version = None
+    
+    _chrome_versions[chrome_binary_path] = chrome_version
+    return chrome_version
+
+# Chrome binary the driver prefers, and whose version picks the chromedriver
+_CHROME_BINARY_PATH = "/usr/bin/google-chrome-stable"
+
+async def _installed_chrome_version() -> Optional[str]:
+    """Get the version of the preferred Chrome binary, or None if it isn't installed."""
+    if not os.path.exists(_CHROME_BINARY_PATH):
+        return None
+    return await _detect_chrome_version(_CHROME_BINARY_PATH)
+
+# Consecutive visits to a URL without agreement checkboxes after which
+# check_agreement_checkboxes skips that URL until the misses expire
+_AGREEMENT_MISS_LIMIT = 5
+_AGREEMENT_MISS_TTL = 3600  # seconds
+_AGREEMENT_MISS_MAX_URLS = 1024
+
+# URL -> (consecutive visits without agreement checkboxes, time of the last one)
+_agreement_misses: Dict[str, Tuple[int, float]] = {}
 
 class WebScraper:
-    def __init__(self, headless: bool = True, user_data: Optional[Dict[str, Any]] = None):
+    def __init__(self, headless: bool = True, user_data: Optional[Dict[str, Any]] = None,
+                 block_resources: bool = True):
         """Initialize the web scraper.
         
         Args:
             headless: Whether to run the browser in headless mode
             user_data: User data for filling forms (billing, shipping, payment info)
+            block_resources: Whether to block images, media, fonts and trackers
         """
         self.headless = headless
+        self.block_resources = block_resources
         self.driver = None
         self.user_data = user_data or self._get_default_user_data()
+        # Plain-JSON copy of user_data for script arguments, built on first use
+        self._user_data_payload: Optional[Dict[str, Any]] = None
+        # handle_modern_styled_inputs expression with user_data embedded, built on first use
+        self._modern_inputs_source: Optional[str] = None
+        # Known-good option selectors per page, or a (_SELECTOR_MISS, timestamp) marker
+        self._selector_cache: Dict[str, Union[List[str], Tuple[str, float]]] = {}
+        # Parsed snapshot of the last scraped body, for in-process selector checks
+        self.local_tree: Optional[HTMLParser] = None
+        self._local_tree_url: Optional[str] = None
+        # (page signature, field types) of the last detect_form_fields run
+        self._form_fields_cache: Optional[Tuple[str, Dict[str, List[Dict[str, str]]]]] = None
+    
+    @classmethod
+    async def acquire(cls, user_data: Optional[Dict[str, Any]] = None, headless: bool = True) -> "WebScraper":
+        """Get a scraper with a running browser, preferring one started ahead of time.
+        
+        With PREWARM_BROWSERS set, a replacement spare is started in the
+        background, so the next caller also skips the browser start-up.
+        
+        Args:
+            user_data: User data for filling forms, or None for the defaults
+            headless: Whether the browser should run in headless mode
+            
+        Returns:
+            A scraper whose driver is initialized
+        """
+        scraper = None
+        while _warm_scrapers and scraper is None:
+            candidate = _warm_scrapers.pop()
+            if candidate.driver and candidate.headless == headless:
+                try:
+                    # A browser that died while idle fails this round-trip
+                    candidate.driver.window_handles
+                    scraper = candidate
+                    continue
+                except WebDriverException as e:
+                    logger.warning(f"Discarding a pre-started browser that stopped responding: {e}")
+            candidate.quit_driver()
+        
+        if scraper is None:
+            scraper = cls(headless=headless, user_data=user_data)
+            await scraper.initialize_driver()
+        else:
+            logger.info("Using a pre-started browser")
+            if user_data:
+                scraper.set_user_data(user_data)
+        
+        if PREWARM_BROWSERS:
+            task = asyncio.get_running_loop().create_task(cls.prewarm(headless=headless))
+            _prewarm_tasks.add(task)
+            task.add_done_callback(_prewarm_tasks.discard)
+        return scraper
+    
+    @classmethod
+    async def prewarm(cls, headless: bool = True) -> None:
+        """Start browsers ahead of demand until _WARM_POOL_SIZE are idle.
+        
+        Does nothing unless PREWARM_BROWSERS is set. Browsers start in a
+        worker thread so the event loop keeps serving requests meanwhile.
+        
+        Args:
+            headless: Whether the browsers should run in headless mode
+        """
+        global _warm_pending
+        if not PREWARM_BROWSERS:
+            return
+        chrome_version = await _installed_chrome_version()
+        while not _warm_closed and len(_warm_scrapers) + _warm_pending < _WARM_POOL_SIZE:
+            _warm_pending += 1
+            scraper = cls(headless=headless)
+            try:
+                await asyncio.to_thread(_start_warm_scraper, scraper, chrome_version)
+            except Exception as e:
+                logger.warning(f"Could not pre-start a browser: {e}")
+                return
+            finally:
+                _warm_pending -= 1
+    
+    @classmethod
+    async def scrape_many(cls, urls: List[str], workers: int = 4, headless: bool = True,
+                          block_resources: bool = True) -> List[Optional[Tuple[str, str]]]:
+        """Scrape several pages in parallel, one browser per worker process.
+        
+        Selenium drivers are not safe to share across threads, so each worker
+        process owns its own scraper and driver for the lifetime of the batch.
+        
+        Args:
+            urls: URLs of the pages to scrape
+            workers: Maximum number of worker processes (and browsers)
+            headless: Whether to run the browsers in headless mode
+            block_resources: Whether to block images, media, fonts and trackers
+            
+        Returns:
+            A (current_url, body_content) tuple per URL, in input order, or None
+            where scraping failed
+        """
+        if not urls:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(urls)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_scrape_worker,
+            initargs=(cls, headless, block_resources)
+        )
+        try:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, _scrape_in_worker, url) for url in urls),
+                return_exceptions=True
+            )
+        finally:
+            pool.shutdown(wait=False)
+        
+        pages = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to scrape page {url} in worker: {result}")
+                pages.append(None)
+            else:
+                pages.append(result)
+        return pages
     
-    def _get_default_user_data(self) -> Dict[str, Any]:
+    def _get_default_user_data(self) -> Mapping[str, Any]:
         """Get default user data for filling forms.
         
         Returns:
-            Dictionary with default user data
+            Read-only mapping with default user data, shared by all instances
         """
-        return {
-            "email": "user@example.com",
-            "phone": "1234567890",
-            "first_name": "John",
-            "last_name": "Doe",
-            "address": {
-                "street": "123 Main St",
-                "apt": "Apt 4B",
-                "city": "New York",
-                "state": "NY",
-                "zip": "10001",
-                "country": "United States"
-            },
-            "payment_method": {
-                "card_number": "4111111111111111",
-                "expiry_month": "12",
-                "expiry_year": "2025",
-                "cvv": "123"
-            }
-        }
+        return _DEFAULT_USER_DATA
     
     def set_user_data(self, user_data: Dict[str, Any]) -> None:
         """Set user data for filling forms.
@@ -64,29 +1698,50 @@ class WebScraper:
             user_data: User data dictionary
         """
         self.user_data = user_data
+        self._user_data_payload = None
+        self._modern_inputs_source = None
         logger.info("User data updated for form filling")
     
+    def _user_data_args(self) -> Dict[str, Any]:
+        """Return user_data as plain JSON types for passing to page scripts.
+        
+        The conversion runs once per user data set and is reused by every fill.
+        
+        Returns:
+            JSON-compatible copy of user_data
+        """
+        if self._user_data_payload is None:
+            self._user_data_payload = json.loads(json.dumps(self.user_data, default=dict))
+        return self._user_data_payload
+    
     async def initialize_driver(self):
-        """Initialize the Selenium WebDriver with proper Chrome version handling."""
+        """Initialize the Selenium WebDriver with proper Chrome version handling.
+        
+        Reuses the running driver if there is one, so a session can serve many pages.
+        """
+        if self.driver:
+            return self.driver
+        return self._start_driver(await _installed_chrome_version())
+    
+    def _start_driver(self, chrome_version: Optional[str]):
+        """Start Chrome and chromedriver; the blocking part of initialize_driver.
+        
+        Args:
+            chrome_version: Installed Chrome version, or None if unknown
+            
+        Returns:
+            The started WebDriver
+        """
         try:
             chrome_options = Options()
             if self.headless:
                 chrome_options.add_argument("--headless")
             
             # Add location of Chrome binary
-            chrome_binary_path = "/usr/bin/google-chrome-stable"
+            chrome_binary_path = _CHROME_BINARY_PATH
             if os.path.exists(chrome_binary_path):
                 chrome_options.binary_location = chrome_binary_path
                 logger.info(f"Using Chrome binary at: {chrome_binary_path}")
-                
-                # Get Chrome version
-                try:
-                    import subprocess
-                    chrome_version = subprocess.check_output([chrome_binary_path, '--version']).decode().strip().split()[-1]
-                    logger.info(f"Detected Chrome version: {chrome_version}")
-                except Exception as e:
-                    logger.warning(f"Could not detect Chrome version: {e}")
-                    chrome_version = None
             else:
                 # Try to find Chrome binary
                 possible_paths = [
@@ -108,6 +1763,9 @@ class WebScraper:
             chrome_options.add_argument("--disable-gpu")
             chrome_options.add_argument("--window-size=1920,1080")
             
+            # Return from navigation at DOMContentLoaded instead of waiting for every subresource
+            chrome_options.page_load_strategy = "eager"
+            
             # Add WebGL related options to prevent SwiftShader warning
             chrome_options.add_argument("--disable-software-rasterizer")
             chrome_options.add_argument("--disable-webgl")
@@ -126,11 +1784,17 @@ class WebScraper:
                 # First, try to use the local chromedriver binary (most reliable in headless VPS)
                 logger.info("Attempting to use local chromedriver binary")
                 local_driver_path = "/home/ubuntu/Scrape_code/chromedriver-linux64/chromedriver"
+                pinned_driver_path = _read_pinned_chromedriver_path()
                 if os.path.exists(local_driver_path):
                     from selenium.webdriver.chrome.service import Service as ChromeService
                     service = ChromeService(executable_path=local_driver_path)
                     self.driver = webdriver.Chrome(service=service, options=chrome_options)
                     logger.info("Successfully initialized with local ChromeDriver")
+                elif pinned_driver_path:
+                    # Resolved once at service startup, so WebDriver Manager stays off the hot path
+                    service = Service(executable_path=pinned_driver_path)
+                    self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                    logger.info(f"Successfully initialized with pinned chromedriver at {pinned_driver_path}")
                 else:
                     # If local driver not found, try with ChromeDriverManager
                     logger.info("Local chromedriver not found, trying with ChromeDriverManager")
@@ -196,6 +1860,20 @@ class WebScraper:
                         logger.error(error_msg)
                         raise ValueError(error_msg)
             
+            self.driver.set_page_load_timeout(_PAGE_LOAD_TIMEOUT)
+            # Lookups wait explicitly where they need to; an implicit wait would make
+            # every probe that finds nothing (iframe and checkbox scans) stall
+            self.driver.implicitly_wait(0)
+            
+            if self.block_resources:
+                self._block_heavy_resources()
+            
+            self._install_network_idle_probe()
+            self._install_element_index()
+            self._install_set_input_helper()
+            self._install_button_finder()
+            self._install_agreement_checker()
+            
             logger.info("Selenium WebDriver initialized successfully")
             return self.driver
             
@@ -203,6 +1881,183 @@ class WebScraper:
             logger.error(f"Failed to initialize WebDriver: {e}")
             raise
     
+    def _block_heavy_resources(self) -> None:
+        """Block noise subresources at the network layer via the DevTools protocol."""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+            logger.info(f"Blocking {len(_BLOCKED_URL_PATTERNS)} subresource URL patterns")
+        except Exception as e:
+            logger.warning(f"Could not enable subresource blocking: {e}")
+    
+    def _install_network_idle_probe(self) -> None:
+        """Inject the fetch/XHR activity probe into every document the driver opens."""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _NETWORK_IDLE_PROBE_JS})
+        except Exception as e:
+            logger.warning(f"Could not install network idle probe: {e}")
+    
+    def _install_element_index(self) -> None:
+        """Maintain a mutation-driven index of quantity fields in every document the driver opens."""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": f"{_ELEMENT_INDEX_JS}({json.dumps(list(_INDEXED_SELECTORS))});"
+            })
+        except Exception as e:
+            logger.warning(f"Could not install element index: {e}")
+    
+    def _install_set_input_helper(self) -> None:
+        """Register the framework-aware input setter once in every document the driver opens."""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _INSTALL_SET_INPUT_JS})
+        except Exception as e:
+            logger.warning(f"Could not install input setter: {e}")
+    
+    def _install_button_finder(self) -> None:
+        """Register the batched visible-button finder once in every document the driver opens."""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _INSTALL_FIND_VISIBLE_JS})
+        except Exception as e:
+            logger.warning(f"Could not install button finder: {e}")
+    
+    def _install_agreement_checker(self) -> None:
+        """Register the bulk agreement-checkbox checker once in every document the driver opens."""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _INSTALL_CHECK_AGREEMENT_JS})
+        except Exception as e:
+            logger.warning(f"Could not install agreement checker: {e}")
+    
+    def _set_input_value(self, element, value: str, with_key_events: bool = False) -> Optional[str]:
+        """Set an input's value through the registered setter, shipping the full script only if needed.
+        
+        Args:
+            element: Input WebElement to set
+            value: Value to set
+            with_key_events: Also dispatch keydown/keyup around the change
+            
+        Returns:
+            The input's value after setting it
+        """
+        result = self.driver.execute_script(_CALL_SET_INPUT_JS, element, value, with_key_events)
+        if result is None:
+            result = self.driver.execute_script(_SET_INPUT_JS, element, value, with_key_events)
+        return result
+    
+    def _wait_ready(self, timeout: float = _READY_TIMEOUT) -> bool:
+        """Wait until the document is parsed and fetch/XHR traffic has gone quiet.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if the page settled within the timeout, False otherwise
+        """
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda d: d.execute_script(_PAGE_SETTLED_JS, _NETWORK_IDLE_MS)
+            )
+            return True
+        except TimeoutException:
+            logger.debug(f"Page did not settle within {timeout}s")
+            return False
+    
+    def _wait_after_click(self, element, old_url: str, timeout: float = _CLICK_SETTLE_TIMEOUT) -> bool:
+        """Wait until a click has visibly taken effect: an alert, a stale button or a new URL.
+        
+        Args:
+            element: The element that was clicked
+            old_url: URL before the click
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if the click took effect within the timeout, False otherwise
+        """
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(EC.any_of(
+                EC.alert_is_present(),
+                EC.staleness_of(element),
+                EC.url_changes(old_url)
+            ))
+            return True
+        except TimeoutException:
+            logger.debug(f"No navigation, alert or DOM replacement within {timeout}s of click")
+            return False
+    
+    def _take_alert(self) -> Optional[str]:
+        """Accept an open JavaScript alert and return its text.
+        
+        Must run before any other command while a dialog may be open, since
+        chromedriver dismisses the dialog when a command hits it.
+        
+        Returns:
+            The alert text, or None if no alert is open
+        """
+        alert = EC.alert_is_present()(self.driver)
+        if not alert:
+            return None
+        alert_text = alert.text
+        alert.accept()
+        return alert_text
+    
+    def _wait_after_action(self, initial_url: str, timeout: float = _ACTION_SETTLE_TIMEOUT) -> None:
+        """Wait until an injected action has navigated, raised an alert or let the page settle.
+        
+        Args:
+            initial_url: URL before the action ran
+            timeout: Maximum time to wait in seconds
+        """
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(EC.any_of(
+                EC.alert_is_present(),
+                EC.url_changes(initial_url),
+                lambda d: d.execute_script(_ACTION_SETTLED_JS, _NETWORK_IDLE_MS)
+            ))
+        except TimeoutException:
+            logger.debug(f"Action did not navigate or settle within {timeout}s")
+            return
+        
+        # Leave an open alert for the caller; any command now would dismiss it
+        if EC.alert_is_present()(self.driver):
+            return
+        
+        # A navigation only guarantees the new URL; let the new page finish loading too
+        try:
+            if self.driver.current_url != initial_url:
+                self._wait_ready(timeout=timeout)
+        except Exception as e:
+            logger.debug(f"Error waiting for page after action: {e}")
+    
+    async def __aenter__(self) -> "WebScraper":
+        await self.initialize_driver()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.quit_driver()
+    
+    def reset_between_pages(self) -> None:
+        """Clear cookies and web storage so the next site starts clean without a new browser."""
+        if not self.driver:
+            return
+        try:
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception as e:
+            # Storage is not accessible on about:blank and some opaque origins
+            logger.debug(f"Could not clear web storage: {e}")
+        self.driver.delete_all_cookies()
+        self._selector_cache.clear()
+    
+    def quit_driver(self) -> None:
+        """Quit the Selenium WebDriver immediately, without the checkout steps of close_driver."""
+        if not self.driver:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.error(f"Error while quitting WebDriver: {e}")
+        finally:
+            self.driver = None
+            logger.info("Selenium WebDriver closed")
+    
     async def close_driver(self):
         """Close the Selenium WebDriver with proper error handling."""
         try:
@@ -262,75 +2117,112 @@ class WebScraper:
             logger.info("Looking for React Select fields")
             
             # Find React Select input fields
-            react_select_inputs = self.driver.find_elements(By.CSS_SELECTOR, "[id^='react-select'][id$='-input']")
+            react_select_inputs = self.driver.execute_script(_VISIBLE_ENABLED_JS, _REACT_SELECT_INPUT_SELECTOR) or []
             
             for input_field in react_select_inputs:
-                if input_field.is_displayed() and input_field.is_enabled():
+                try:
+                    # Get the field ID to determine what type of field it is
+                    field_id = input_field.get_attribute("id")
+                    parent_container = input_field.find_element(By.XPATH, "./ancestor::div[contains(@class, 'react-select')]")
+                    
+                    # Try to get label or context from parent containers in one round-trip
+                    context_text = ""
                     try:
-                        # Get the field ID to determine what type of field it is
-                        field_id = input_field.get_attribute("id")
-                        parent_container = input_field.find_element(By.XPATH, "./ancestor::div[contains(@class, 'react-select')]")
+                        context_text = self.driver.execute_script(_ANCESTOR_CONTEXT_JS, input_field) or ""
+                    except JavascriptException as e:
+                        logger.debug(f"Error reading React Select context: {e}")
+                    
+                    logger.info(f"Found React Select field: {field_id} with context: {context_text}")
+                    
+                    # Determine what data to fill based on context
+                    value_to_fill = None
+                    matched_types = {_SELECT_FIELD_KEYWORDS[word] for word in _SELECT_FIELD_RE.findall(context_text)}
+                    
+                    if "country" in field_id.lower() or "country" in matched_types:
+                        value_to_fill = self.user_data['address']['country']
+                        logger.info(f"Filling country select with: {value_to_fill}")
+                    elif "state" in matched_types:
+                        value_to_fill = self.user_data['address']['state']
+                        logger.info(f"Filling state select with: {value_to_fill}")
+                    
+                    if value_to_fill:
+                        # Click to open the dropdown
+                        parent_container.click()
+                        self._wait_for_react_select_options()
+
+                        # Enter the value in the input field
+                        input_field.send_keys(value_to_fill)
+                        self._wait_for_react_select_options()
                         
-                        # Try to get label or context
-                        context_text = ""
+                        # Try to find and click the matching option
                         try:
-                            # Look for label in parent containers
-                            for i in range(1, 5):  # Check up to 5 levels up
-                                parent = input_field.find_element(By.XPATH, f"./{'ancestor::div[1]' * i}")
-                                parent_text = parent.text.lower()
-                                if parent_text and len(parent_text) < 100:  # Avoid getting too much text
-                                    context_text = parent_text
-                                    break
-                        except:
-                            pass
-                        
-                        logger.info(f"Found React Select field: {field_id} with context: {context_text}")
-                        
-                        # Determine what data to fill based on context
-                        value_to_fill = None
-                        
-                        if "country" in field_id.lower() or "country" in context_text:
-                            value_to_fill = self.user_data['address']['country']
-                            logger.info(f"Filling country select with: {value_to_fill}")
-                        elif any(word in context_text for word in ["state", "province", "region"]):
-                            value_to_fill = self.user_data['address']['state']
-                            logger.info(f"Filling state select with: {value_to_fill}")
-                        
-                        if value_to_fill:
-                            # Click to open the dropdown
-                            parent_container.click()
-                            time.sleep(0.5)
+                            # Match and click the option in the browser in one round-trip
+                            selected_text = self.driver.execute_script(_SELECT_OPTION_JS, value_to_fill)
                             
-                            # Enter the value in the input field
-                            input_field.send_keys(value_to_fill)
-                            time.sleep(0.5)
-                            
-                            # Try to find and click the matching option
-                            try:
-                                # Look for options that appear after clicking
-                                options = self.driver.find_elements(By.CSS_SELECTOR, "[id^='react-select'][role='option']")
-                                
-                                if options:
-                                    for option in options:
-                                        if value_to_fill.lower() in option.text.lower():
-                                            option.click()
-                                            logger.info(f"Selected option: {option.text}")
-                                            break
-                                else:
-                                    # If no options found, try pressing Enter
-                                    input_field.send_keys(Keys.ENTER)
-                                    logger.info("No options found, pressed Enter")
-                            except Exception as e:
-                                logger.warning(f"Error selecting option: {e}")
-                                # Try pressing Enter as a fallback
+                            if selected_text is not None:
+                                if selected_text:
+                                    logger.info(f"Selected option: {selected_text}")
+                            else:
+                                # If no options found, try pressing Enter
                                 input_field.send_keys(Keys.ENTER)
-                    
-                    except Exception as e:
-                        logger.warning(f"Error handling React Select field: {e}")
+                                logger.info("No options found, pressed Enter")
+                        except Exception as e:
+                            logger.warning(f"Error selecting option: {e}")
+                            # Try pressing Enter as a fallback
+                            input_field.send_keys(Keys.ENTER)
+                
+                except Exception as e:
+                    logger.warning(f"Error handling React Select field: {e}")
             
             logger.info("React Select field handling complete")
         except Exception as e:
             logger.error(f"Error handling React Select fields: {e}")
+
+    def _wait_for_react_select_options(self, timeout_ms: int = 500) -> bool:
+        """Wait until React Select options appear in the DOM.
+
+        Args:
+            timeout_ms: Maximum time to wait in milliseconds
+
+        Returns:
+            True if options appeared before the timeout, False otherwise
+        """
+        try:
+            return bool(self.driver.execute_async_script(_WAIT_FOR_OPTIONS_JS, timeout_ms))
+        except (TimeoutException, JavascriptException) as e:
+            logger.debug(f"Error waiting for React Select options: {e}")
+            return False
+
+    def _modern_inputs_expression(self) -> str:
+        """Return the Runtime.evaluate expression for handle_modern_styled_inputs.
+        
+        The user data is serialized into it once per user data set.
+        
+        Returns:
+            _MODERN_INPUTS_JS applied to the user data, debug flag and input selector
+        """
+        if self._modern_inputs_source is None:
+            payload = {
+                "first_name": self.user_data['first_name'],
+                "last_name": self.user_data['last_name'],
+                "email": self.user_data['email'],
+                "phone": self.user_data['phone'],
+                "street": self.user_data['address']['street'],
+                "apt": self.user_data['address']['apt'],
+                "city": self.user_data['address']['city'],
+                "state": self.user_data['address']['state'],
+                "zip": self.user_data['address']['zip'],
+                "country": self.user_data['address']['country'],
+                "card_number": self.user_data['payment_method']['card_number'],
+                "cvv": self.user_data['payment_method']['cvv'],
+                "expiry_month": self.user_data['payment_method']['expiry_month'],
+                "expiry_year": self.user_data['payment_method']['expiry_year']
+            }
+            self._modern_inputs_source = (
+                f"{_MODERN_INPUTS_JS}({json.dumps(payload)}, {json.dumps(_JS_DEBUG)}, "
+                f"{json.dumps(_MODERN_INPUT_SELECTOR)})"
+            )
+        return self._modern_inputs_source
     
     async def handle_modern_styled_inputs(self) -> None:
         """Handle modern styled inputs with floating labels, peer classes, and other modern UI patterns."""
@@ -340,261 +2232,138 @@ class WebScraper:
             
             logger.info("Looking for modern styled inputs")
             
-            # Execute JavaScript to find and fill modern styled inputs based on context
-            self.driver.execute_script("""
-                // Helper function to determine field type from context
-                function determineFieldType(context) {
-                    context = context.toLowerCase();
-                    if (context.includes('name') || context.includes('full name') || context.includes('fullname')) {
-                        return 'name';
-                    } else if (context.includes('email')) {
-                        return 'email';
-                    } else if (context.includes('phone') || context.includes('telephone') || context.includes('mobile')) {
-                        return 'phone';
-                    } else if (context.includes('address') && !context.includes('address 2') && !context.includes('line 2')) {
-                        return 'address';
-                    } else if (context.includes('address 2') || context.includes('line 2') || context.includes('apt') || context.includes('suite')) {
-                        return 'address2';
-                    } else if (context.includes('city')) {
-                        return 'city';
-                    } else if (context.includes('state') || context.includes('province') || context.includes('region')) {
-                        return 'state';
-                    } else if (context.includes('zip') || context.includes('postal')) {
-                        return 'zip';
-                    } else if (context.includes('country')) {
-                        return 'country';
-                    } else if (context.includes('card') && context.includes('number')) {
-                        return 'cardnumber';
-                    } else if (context.includes('cvv') || context.includes('cvc') || context.includes('security code')) {
-                        return 'cvv';
-                    } else if (context.includes('expiry') || context.includes('expiration')) {
-                        return 'expiry';
-                    }
-                    return 'unknown';
-                }
-                
-                // Find all inputs with modern styling patterns
-                const modernInputSelectors = [
-                    'input.peer', 
-                    'input.text-blue-gray-700',
-                    'input.bg-transparent',
-                    'input.border-blue-gray-200',
-                    'input[name="fullName"]',  // Add specific selector for fullName
-                    'input.placeholder-shown\\:border',
-                    'input.focus\\:outline',
-                    'input.transition-all',
-                    'input.rounded-\\[7px\\]',
-                    'input.w-full.h-full',
-                    'input.code',
-                    '.form-control',
-                    '.form-input',
-                    '.input-field',
-                    '.chakra-input',
-                    '.mui-input',
-                    '.ant-input'
-                ];
-                
-                // Try each selector
-                for (const selector of modernInputSelectors) {
-                    try {
-                        const inputs = document.querySelectorAll(selector);
-                        console.log(`Found ${inputs.length} inputs with selector: ${selector}`);
-                        
-                        for (const input of inputs) {
-                            if (input.type === 'hidden' || !input.offsetParent) continue; // Skip hidden inputs
-                            
-                            // Get context from parent elements
-                            let context = '';
-                            let parent = input.parentElement;
-                            for (let i = 0; i < 3 && parent; i++) { // Check up to 3 levels up
-                                context += ' ' + (parent.textContent || '');
-                                
-                                // Also check for labels
-                                const labels = parent.querySelectorAll('label');
-                                for (const label of labels) {
-                                    context += ' ' + (label.textContent || '');
-                                }
-                                
-                                parent = parent.parentElement;
-                            }
-                            
-                            // Also check for aria-label and placeholder
-                            context += ' ' + (input.getAttribute('aria-label') || '');
-                            context += ' ' + (input.getAttribute('placeholder') || '');
-                            context += ' ' + (input.name || '');
-                            context += ' ' + (input.id || '');
-                            
-                            // Determine field type from context
-                            const fieldType = determineFieldType(context);
-                            console.log(`Field type determined as: ${fieldType} for context: ${context.substring(0, 50)}...`);
-                            
-                            // Fill the field based on type
-                            if (fieldType === 'name') {
-                                input.value = arguments[0] + ' ' + arguments[1];
-                                console.log('Filled name field');
-                            } else if (fieldType === 'email') {
-                                input.value = arguments[2];
-                                console.log('Filled email field');
-                            } else if (fieldType === 'phone') {
-                                input.value = arguments[3];
-                                console.log('Filled phone field');
-                            } else if (fieldType === 'address') {
-                                input.value = arguments[4];
-                                console.log('Filled address field');
-                            } else if (fieldType === 'address2') {
-                                input.value = arguments[5];
-                                console.log('Filled address2 field');
-                            } else if (fieldType === 'city') {
-                                input.value = arguments[6];
-                                console.log('Filled city field');
-                            } else if (fieldType === 'state') {
-                                input.value = arguments[7];
-                                console.log('Filled state field');
-                            } else if (fieldType === 'zip') {
-                                input.value = arguments[8];
-                                console.log('Filled zip field');
-                            } else if (fieldType === 'country') {
-                                input.value = arguments[9];
-                                console.log('Filled country field');
-                            } else if (fieldType === 'cardnumber') {
-                                input.value = arguments[10];
-                                console.log('Filled card number field');
-                            } else if (fieldType === 'cvv') {
-                                input.value = arguments[11];
-                                console.log('Filled CVV field');
-                            } else if (fieldType === 'expiry') {
-                                input.value = arguments[12] + '/' + arguments[13].slice(-2);
-                                console.log('Filled expiry field');
-                            }
-                            
-                            // Trigger events to ensure the value is registered
-                            input.dispatchEvent(new Event('input', { bubbles: true }));
-                            input.dispatchEvent(new Event('change', { bubbles: true }));
-                            
-                            // For modern frameworks, we need to trigger a focus event first, then blur
-                            input.dispatchEvent(new Event('focus', { bubbles: true }));
-                            setTimeout(() => {
-                                input.dispatchEvent(new Event('blur', { bubbles: true }));
-                            }, 100);
-                        }
-                    } catch (e) {
-                        console.error(`Error with selector ${selector}:`, e);
-                    }
-                }
-                
-                // Specifically handle the example class pattern
-                try {
-                    const specificInputs = document.querySelectorAll('input.code.peer.w-full.h-full.bg-transparent.text-blue-gray-700, input.peer.w-full.h-full.bg-transparent.text-blue-gray-700');
-                    console.log(`Found ${specificInputs.length} inputs with specific class pattern`);
-                    
-                    for (const input of specificInputs) {
-                        if (input.type === 'hidden' || !input.offsetParent) continue; // Skip hidden inputs
-                        
-                        // Get context from parent elements
-                        let context = '';
-                        let parent = input.parentElement;
-                        for (let i = 0; i < 3 && parent; i++) { // Check up to 3 levels up
-                            context += ' ' + (parent.textContent || '');
-                            parent = parent.parentElement;
-                        }
-                        
-                        // Determine field type from context
-                        const fieldType = determineFieldType(context);
-                        console.log(`Specific pattern field type: ${fieldType}`);
-                        
-                        // Fill the field based on type (same logic as above)
-                        if (fieldType === 'name') {
-                            input.value = arguments[0] + ' ' + arguments[1];
-                        } else if (fieldType === 'email') {
-                            input.value = arguments[2];
-                        } else if (fieldType === 'phone') {
-                            input.value = arguments[3];
-                        } else if (fieldType === 'address') {
-                            input.value = arguments[4];
-                        } else if (fieldType === 'address2') {
-                            input.value = arguments[5];
-                        } else if (fieldType === 'city') {
-                            input.value = arguments[6];
-                        } else if (fieldType === 'state') {
-                            input.value = arguments[7];
-                        } else if (fieldType === 'zip') {
-                            input.value = arguments[8];
-                        } else if (fieldType === 'country') {
-                            input.value = arguments[9];
-                        }
-                        
-                        // Trigger events
-                        input.dispatchEvent(new Event('input', { bubbles: true }));
-                        input.dispatchEvent(new Event('change', { bubbles: true }));
-                        input.dispatchEvent(new Event('focus', { bubbles: true }));
-                        setTimeout(() => {
-                            input.dispatchEvent(new Event('blur', { bubbles: true }));
-                        }, 100);
-                    }
-                } catch (e) {
-                    console.error('Error handling specific class pattern:', e);
-                }
-            """,
-            self.user_data['first_name'],
-            self.user_data['last_name'],
-            self.user_data['email'],
-            self.user_data['phone'],
-            self.user_data['address']['street'],
-            self.user_data['address']['apt'],
-            self.user_data['address']['city'],
-            self.user_data['address']['state'],
-            self.user_data['address']['zip'],
-            self.user_data['address']['country'],
-            self.user_data['payment_method']['card_number'],
-            self.user_data['payment_method']['cvv'],
-            self.user_data['payment_method']['expiry_month'],
-            self.user_data['payment_method']['expiry_year']
-            )
+            # Evaluate over the DevTools websocket with the user data as a single JSON payload
+            result = self.driver.execute_cdp_cmd("Runtime.evaluate", {
+                "expression": self._modern_inputs_expression(),
+                "awaitPromise": True,
+                "returnByValue": True
+            })
+            if result.get("exceptionDetails"):
+                logger.warning(f"Modern styled inputs script raised: {result['exceptionDetails'].get('text')}")
             
             logger.info("Modern styled inputs handling complete")
         except Exception as e:
             logger.error(f"Error handling modern styled inputs: {e}")
     
-    async def scrape_page(self, url: str) -> Tuple[str, str]:
+    async def _fetch_static_page(self, url: str) -> Optional[Tuple[str, str]]:
+        """Fetch a server-rendered page over plain HTTP without a browser.
+        
+        Args:
+            url: URL of the page to fetch
+            
+        Returns:
+            Tuple of (final_url, body_content), or None if the page needs JavaScript
+        """
+        try:
+            response = await _get_http_client().get(url)
+            html = response.text
+            if response.status_code != 200 or len(html) <= 1024 or _JS_APP_MARKER_RE.search(html):
+                return None
+            
+            tree = HTMLParser(html)
+            if tree.body is None:
+                return None
+            
+            logger.info(f"Fetched server-rendered page without browser: {response.url}")
+            return str(response.url), tree.body.html
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP fast path failed for {url}: {e}")
+            return None
+    
+    @contextlib.contextmanager
+    def _script_timeout(self, seconds: float):
+        """Set the driver-wide async script timeout for a block, then restore it.
+        
+        Args:
+            seconds: Async script timeout to use inside the block
+        """
+        previous = self.driver.timeouts.script
+        self.driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            self.driver.set_script_timeout(previous)
+    
+    def _wait_for_full_load(self) -> None:
+        """Wait for the load event on pages that need every subresource."""
+        try:
+            with self._script_timeout(_PAGE_LOAD_TIMEOUT):
+                self.driver.execute_async_script(_WAIT_FOR_LOAD_JS)
+        except TimeoutException:
+            logger.warning(f"Page did not finish loading within {_PAGE_LOAD_TIMEOUT}s")
+    
+    async def scrape_page(self, url: str, prefer_http: bool = False, wait_for_load: bool = False) -> Tuple[str, str]:
         """Scrape a web page and return only the body content to reduce token usage.
         
         Args:
             url: URL of the page to scrape
+            prefer_http: Try a plain HTTP fetch first and only fall back to the
+                browser if the page needs JavaScript. The browser is not
+                navigated when the fast path succeeds, so leave this off when
+                the page will be interacted with afterwards.
+            wait_for_load: Wait for the full load event rather than returning
+                at DOMContentLoaded
             
         Returns:
             Tuple of (current_url, body_content)
         """
         try:
+            if prefer_http:
+                static_page = await self._fetch_static_page(url)
+                if static_page:
+                    return static_page
+            
             if not self.driver:
                 await self.initialize_driver()
             
             logger.info(f"Scraping page: {url}")
-            self.driver.get(url)
+            self._selector_cache.clear()
+            self.local_tree = None
+            try:
+                self.driver.get(url)
+            except TimeoutException:
+                logger.warning(f"Page load exceeded {_PAGE_LOAD_TIMEOUT}s, stopping remaining requests")
+                self.driver.execute_script("window.stop();")
             
-            # Wait for page to load
-            time.sleep(3)
+            if wait_for_load:
+                self._wait_for_full_load()
+            
+            # Wait for the document and its fetch/XHR traffic to settle
+            self._wait_ready()
             
             # Get the current URL (might have changed due to redirects)
             current_url = self.driver.current_url
             
+            # Count the widgets the form helpers act on in one probe
+            try:
+                widgets = self.driver.execute_script(_WIDGET_PROBE_JS, _REACT_SELECT_INPUT_SELECTOR, _MODERN_INPUT_SELECTOR)
+            except Exception as e:
+                logger.debug(f"Widget probe failed, running all form helpers: {e}")
+                widgets = {"checkboxes": 1, "react_selects": 1, "modern_inputs": 1}
+            
             # Check for agreement/consent checkboxes and click them
-            await self.check_agreement_checkboxes()
+            if widgets["checkboxes"]:
+                await self.check_agreement_checkboxes()
             
             # Handle modern styled inputs with floating labels and peer classes
-            await self.handle_modern_styled_inputs()
+            if widgets["modern_inputs"]:
+                await self.handle_modern_styled_inputs()
             
             # Handle React Select dropdown components
-            await self.handle_react_select_fields()
+            if widgets["react_selects"]:
+                await self.handle_react_select_fields()
             
             # Extract only the body element to reduce token usage
-            try:
-                body_element = self.driver.find_element(By.TAG_NAME, "body")
-                body_html = body_element.get_attribute("outerHTML")
+            body_html = self.driver.execute_script("return document.body ? document.body.outerHTML : null;")
+            if body_html:
                 logger.info("Successfully extracted body element")
-            except NoSuchElementException:
+            else:
                 logger.warning("Body element not found, falling back to full page source")
                 body_html = self.driver.page_source
             
+            self.local_tree = HTMLParser(body_html)
+            self._local_tree_url = current_url
+            
             logger.info(f"Successfully scraped page: {current_url}")
             return current_url, body_html
         except Exception as e:
@@ -615,38 +2384,83 @@ class WebScraper:
             
             logger.info(f"Scrolling page to load dynamic content (max {max_scrolls} scrolls)")
             
-            # Get initial page height
-            initial_height = self.driver.execute_script("return document.body.scrollHeight")
+            # The whole scroll sequence runs in the browser and reports back once
+            wait_ms = int(wait_time * 1000)
+            with self._script_timeout((max_scrolls + 4) * wait_time + 5):
+                result = self.driver.execute_async_script(_SCROLL_PAGE_JS, scroll_amount, max_scrolls, wait_ms)
             
-            for i in range(max_scrolls):
-                # Scroll down
-                self.driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
-                
-                # Wait for content to load
-                time.sleep(wait_time)
-                
-                # Check if new content has loaded by comparing page height
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height > initial_height:
-                    logger.info(f"New content loaded after scroll {i+1} (height increased from {initial_height} to {new_height})")
-                    initial_height = new_height
-                
-                logger.debug(f"Completed scroll {i+1}/{max_scrolls}")
-            
-            # Scroll to specific positions where buttons are commonly found
-            positions = [0.25, 0.5, 0.75, 1.0]  # Scroll to 25%, 50%, 75%, and 100% of page
-            for position in positions:
-                self.driver.execute_script(f"window.scrollTo(0, document.body.scrollHeight * {position});")
-                time.sleep(wait_time)
-                logger.debug(f"Scrolled to {int(position*100)}% of page height")
+            for i, old_height, new_height in result["growth"]:
+                logger.info(f"New content loaded after scroll {i+1} (height increased from {old_height} to {new_height})")
             
-            # Scroll back to top
-            self.driver.execute_script("window.scrollTo(0, 0);")
             logger.info("Scrolling complete, returned to top of page")
             
         except Exception as e:
             logger.error(f"Error during page scrolling: {e}")
     
+    def _element_props(self, elements: List[Any]) -> List[Dict[str, Any]]:
+        """Read tag, visibility, state and value of several elements at once.
+        
+        Args:
+            elements: WebElements to inspect
+            
+        Returns:
+            One dict per element with tag, displayed, enabled, selected, value, id, type and text keys
+        """
+        if not elements:
+            return []
+        return self.driver.execute_script(_ELEMENT_PROPS_JS, elements)
+
+    def _current_local_tree(self) -> Optional[HTMLParser]:
+        """Get the parsed body snapshot if it was taken on the page the browser is showing."""
+        if self.local_tree is None or self._local_tree_url != self.driver.current_url:
+            return None
+        return self.local_tree
+    
+    @staticmethod
+    def _snapshot_may_match(snapshot: HTMLParser, css: str) -> bool:
+        """Check a CSS selector against a parsed snapshot without a browser round-trip.
+        
+        Args:
+            snapshot: Parsed page snapshot
+            css: CSS selector to check
+            
+        Returns:
+            False only if the snapshot definitely has no match
+        """
+        try:
+            return snapshot.css_first(css) is not None
+        except Exception:
+            # Selector not supported by the local parser; let the browser decide
+            return True
+    
+    def _quantity_candidate_batches(self):
+        """Yield candidate quantity fields tier by tier, most specific first.
+        
+        Yields:
+            Tuples of (query description, list of matching elements)
+        """
+        snapshot = self._current_local_tree()
+        for css in _QUANTITY_CSS_TIERS:
+            try:
+                # The page's live element index sees inputs rendered after the
+                # snapshot was taken, so the snapshot only gates the DOM query
+                # used without it
+                elements = self.driver.execute_script(_READ_ELEMENT_INDEX_JS, css)
+                if elements is None:
+                    if snapshot is not None and not self._snapshot_may_match(snapshot, css):
+                        logger.debug(f"No match for quantity selector {css} in page snapshot, skipping")
+                        continue
+                    elements = self.driver.find_elements(By.CSS_SELECTOR, css)
+                yield css, elements
+            except Exception as e:
+                logger.debug(f"Error with quantity selector {css}: {e}")
+        
+        for scope in ("sibling", "ancestor"):
+            try:
+                yield f"{scope} text match", self.driver.execute_script(_QUANTITY_NEAR_TEXT_JS, scope) or []
+            except Exception as e:
+                logger.debug(f"Error finding quantity fields by {scope} text: {e}")
+
     async def fill_quantity_fields(self, quantity: int) -> bool:
         """Find and fill quantity input fields on the page.
         
@@ -663,109 +2477,47 @@ class WebScraper:
             
             logger.info(f"Looking for quantity input field to set value: {quantity}")
             
-            # Common selectors for quantity input fields
-            quantity_selectors = [
-                "//input[(contains(@id, 'quantity') or contains(@name, 'quantity') or contains(@class, 'quantity'))]",
-                "//input[(contains(@id, 'quantity') or contains(@name, 'quantity') or contains(@class, 'quantity'))]",
-                "//input[(contains(@id, 'qty') or contains(@name, 'qty') or contains(@class, 'qty'))]",
-                "//input[(contains(@id, 'qty') or contains(@name, 'qty') or contains(@class, 'qty'))]",
-                "//input[(contains(@aria-label, 'quantity') or contains(@placeholder, 'quantity'))]",
-                "//input[(contains(@aria-label, 'quantity') or contains(@placeholder, 'quantity'))]",
-                "//input[@type='number'][@min]",  # Often quantity fields have a min attribute
-                "//select[contains(@id, 'qty') or contains(@name, 'qty') or contains(@class, 'qty')]",
-                # Added label-based selectors
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'quantity')]/following-sibling::input",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'qty')]/following-sibling::input",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'quantity')]/preceding-sibling::input",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'qty')]/preceding-sibling::input",
-                # Added span-based selectors
-                "//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'quantity')]/following-sibling::input",
-                "//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'qty')]/following-sibling::input",
-                "//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'quantity')]/preceding-sibling::input",
-                "//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'qty')]/preceding-sibling::input",
-                # Added parent-based selectors
-                "//div[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'quantity')]//input",
-                "//div[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'qty')]//input"
-            ]
-            
-            for selector in quantity_selectors:
+            for selector, elements in self._quantity_candidate_batches():
                 try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        if element.is_displayed():
+                    for element, props in zip(elements, self._element_props(elements)):
+                        if props['displayed']:
                             # Scroll element into view
                             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
                             time.sleep(0.5)
                             
-                            tag_name = element.tag_name.lower()
+                            tag_name = props['tag']
                             if tag_name == 'select':
                                 # Handle select dropdown
-                                options = element.find_elements(By.TAG_NAME, "option")
-                                # Find the option closest to our desired quantity
-                                closest_option = None
-                                closest_diff = float('inf')
-                                
-                                for option in options:
+                                option_values = []
+                                for value, _ in self.driver.execute_script(_SELECT_OPTIONS_JS, element):
                                     try:
-                                        option_value = int(option.get_attribute("value"))
-                                        diff = abs(option_value - quantity)
-                                        if diff < closest_diff:
-                                            closest_diff = diff
-                                            closest_option = option
+                                        option_values.append(int(value))
                                     except (ValueError, TypeError):
-                                        continue
-                                
-                                if closest_option:
-                                    logger.info(f"Setting quantity dropdown to value: {closest_option.get_attribute('value')}")
-                                    closest_option.click()
+                                        option_values.append(np.nan)
+                                option_values = np.asarray(option_values, dtype=np.float64)
+                                # Find the option closest to our desired quantity
+                                if option_values.size and not np.isnan(option_values).all():
+                                    closest_index = int(np.nanargmin(np.abs(option_values - quantity)))
+                                    selected_value = self.driver.execute_script(_SELECT_INDEX_JS, element, closest_index)
+                                    logger.info(f"Setting quantity dropdown to value: {selected_value}")
                                     return True
                                 
                             else:
                                 # Handle input field
                                 try:
-                                    # First try to clear any existing value trackers
-                                    self.driver.execute_script("""
-                                        if (arguments[0]._valueTracker) {
-                                            arguments[0]._valueTracker.setValue('');
-                                        }
-                                    """, element)
-                                    
-                                    # Try to trigger React-style onChange handler if it exists
-                                    self.driver.execute_script("""
-                                        if (arguments[0].__reactEventHandlers) {
-                                            arguments[0].__reactEventHandlers.onChange({target: {value: arguments[1]}});
-                                        }
-                                    """, element, str(quantity))
-                                    
-                                    # Use native input value setter for framework compatibility
-                                    self.driver.execute_script("""
-                                        const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
-                                        nativeInputValueSetter.call(arguments[0], arguments[1]);
-                                        
-                                        // Dispatch events in the correct order
-                                        arguments[0].dispatchEvent(new Event('focus', { bubbles: true }));
-                                        arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
-                                        arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
-                                        
-                                        // Move focus to body element after setting value
-                                        document.body.focus();
-                                        arguments[0].dispatchEvent(new Event('blur', { bubbles: true }));
-                                        
-                                        // For React-style frameworks
-                                        if (window.React && window.React.events) {
-                                            window.React.events.emit('change', arguments[1]);
-                                        }
-                                    """, element, str(quantity))
-                                    
-                                    # Verify the value was set
-                                    actual_value = element.get_attribute('value')
+                                    # Clear value trackers, fire framework handlers and set the
+                                    # value natively in one call; the script returns the value read back
+                                    actual_value = self._set_input_value(element, str(quantity))
+                                    if actual_value != str(quantity):
+                                        # Retry with keyboard events for inputs that only accept typing
+                                        actual_value = self._set_input_value(element, str(quantity), with_key_events=True)
                                     if actual_value != str(quantity):
-                                        # If value didn't stick, try direct property setting
+                                        # If value still didn't stick, type it in
                                         element.clear()
                                         element.send_keys(str(quantity))
                                         
-                                    # Add a small delay to let framework updates process
-                                    time.sleep(0.5)
+                                    # Let framework updates and any requests they trigger settle
+                                    self._wait_ready(timeout=2)
                                     
                                     logger.info(f"Set quantity input field to value: {quantity}")
                                     return True
@@ -776,7 +2528,7 @@ class WebScraper:
                                         # Fallback to basic Selenium actions
                                         element.clear()
                                         element.send_keys(str(quantity))
-                                        time.sleep(0.5)
+                                        self._wait_ready(timeout=2)
                                         return True
                                     except:
                                         return False
@@ -786,23 +2538,11 @@ class WebScraper:
             # If no direct quantity field found, look for quantity buttons (+ and -)
             logger.info("No direct quantity input found, looking for quantity adjustment buttons")
             
-            # Find elements that might be quantity adjustment buttons
-            plus_button_selectors = [
-                "//button[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
-                "//button[contains(text(), '+')]",
-                "//a[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
-                "//a[contains(text(), '+')]",
-                "//span[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
-                "//span[contains(text(), '+')]",
-                "//div[contains(@class, 'plus') or contains(@class, 'increment') or contains(@class, 'increase')]",
-                "//div[contains(text(), '+')]"
-            ]
-            
-            for selector in plus_button_selectors:
+            for selector in _PLUS_BUTTON_XPATH_UNIONS:
                 try:
                     elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        if element.is_displayed():
+                    for element, props in zip(elements, self._element_props(elements)):
+                        if props['displayed']:
                             # Try to find the quantity display (often between +/- buttons)
                             logger.info("find quantity display")
                             quantity_display = None
@@ -815,9 +2555,9 @@ class WebScraper:
                                     f"//input[ancestor::div[contains(., '+')]] | //span[ancestor::div[contains(., '+')]]"
                                 )
                                 
-                                for display in display_elements:
-                                    if display.is_displayed():
-                                        quantity_display = display
+                                for display_props in self._element_props(display_elements):
+                                    if display_props['displayed']:
+                                        quantity_display = display_props
                                         break
                             except:
                                 pass
@@ -826,16 +2566,23 @@ class WebScraper:
                             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
                             time.sleep(0.5)
                             
+                            # Prefer writing the value into the input the buttons control
+                            stepper_input = self.driver.execute_script(_STEPPER_INPUT_JS, element)
+                            if stepper_input is not None:
+                                if self._set_input_value(stepper_input, str(quantity)) == str(quantity):
+                                    logger.info(f"Set quantity input next to + button to value: {quantity}")
+                                    return True
+                            
                             # Click the + button until we reach the desired quantity
                             current_qty = 1  # Default starting quantity
                             
                             # Try to get current quantity if display element was found
                             if quantity_display:
                                 try:
-                                    if quantity_display.tag_name.lower() == 'input':
-                                        current_qty = int(quantity_display.get_attribute('value') or '1')
+                                    if quantity_display['tag'] == 'input':
+                                        current_qty = int(quantity_display['value'] or '1')
                                     else:
-                                        current_qty = int(quantity_display.text.strip() or '1')
+                                        current_qty = int(quantity_display['text'] or '1')
                                 except (ValueError, TypeError):
                                     current_qty = 1
                             
@@ -843,17 +2590,14 @@ class WebScraper:
                             clicks_needed = max(0, quantity - current_qty)
                             logger.info(f"Current quantity: {current_qty}, clicking + button {clicks_needed} times")
                             
-                            for _ in range(clicks_needed):
-                                try:
-                                    self.driver.execute_script("arguments[0].click();", element)
-                                    time.sleep(0.2)  # Small delay between clicks
-                                except:
-                                    try:
-                                        element.click()
-                                        time.sleep(0.2)
-                                    except:
-                                        logger.warning("Failed to click + button")
-                                        break
+                            # All clicks happen in one script, yielding between clicks so
+                            # the page can re-render
+                            with self._script_timeout(clicks_needed * _STEPPER_CLICK_GAP_MS / 1000 + 5):
+                                clicks_done = self.driver.execute_async_script(
+                                    _CLICK_REPEATEDLY_JS, element, clicks_needed, _STEPPER_CLICK_GAP_MS
+                                )
+                            if clicks_done < clicks_needed:
+                                logger.warning(f"Failed to click + button after {clicks_done} clicks")
                             
                             logger.info(f"Adjusted quantity using + button approximately to: {quantity}")
                             return True
@@ -864,8 +2608,58 @@ class WebScraper:
             return False
             
         except Exception as e:
-            logger.error(f"Error filling quantity field: {e}")
+            logger.error(f"Error filling quantity field: {e}")
+            return False
+
+    def _is_clickable_sync(self, element) -> bool:
+        """Check in one script call whether an element can take a click right now.
+        
+        Args:
+            element: WebElement to check
+            
+        Returns:
+            True if the element has a box, is enabled and accepts pointer events
+        """
+        try:
+            return bool(self.driver.execute_script(_CLICKABLE_JS, element))
+        except Exception as e:
+            logger.debug(f"Error checking if element is clickable: {e}")
             return False
+    
+    def _first_matching(self, selectors: List[str], by: str = By.XPATH):
+        """Lazily yield candidate elements, selector by selector, in priority order.
+        
+        Later selectors are only queried if the caller keeps iterating, so
+        stopping at the first element that works skips the remaining lookups.
+        
+        Args:
+            selectors: Selectors to try in order
+            by: Locator strategy for the selectors
+            
+        Yields:
+            Tuples of (selector, element, element properties)
+        """
+        for selector in selectors:
+            try:
+                elements = self.driver.find_elements(by, selector)
+                props = self._element_props(elements)
+            except Exception as e:
+                logger.debug(f"Error with selector {selector}: {e}")
+                continue
+            logger.debug(f"Selector {selector} matched {len(elements)} elements")
+            for element, element_props in zip(elements, props):
+                yield selector, element, element_props
+    
+    def _remember_selector(self, cache_key: str, selector: str) -> None:
+        """Move a selector that just worked to the front of the page's cache entry.
+        
+        Args:
+            cache_key: Page and option key the selector belongs to
+            selector: Selector that matched and selected the option
+        """
+        cached = self._selector_cache.get(cache_key)
+        known = cached if isinstance(cached, list) else []
+        self._selector_cache[cache_key] = [selector] + [s for s in known if s != selector]
 
     async def select_product_option(self, option_name: str, option_value: str) -> bool:
         """Select a product option like size, color, etc.
@@ -881,133 +2675,101 @@ class WebScraper:
             # Debug logging
             logger.info(f"Attempting to select option '{option_name}' with value '{option_value}'")
             
-            # Common selectors for product options
+            # Common selectors for product options, one XPath union per priority tier
             selectors = [
-                # Modern UI selectors
-                f"//button[@role='option']//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]/ancestor::button",
-                f"//*[@role='option' and descendant::*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]]",
-                f"//button[descendant::*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]]",
-                
-                # Direct element selectors
-                f"//select[contains(@id, '{option_name}') or contains(@name, '{option_name}') or contains(@class, '{option_name}')]",
-                f"//div[contains(@class, 'product-options')]//select[contains(@id, '{option_name}')]",
-                f"//div[contains(@class, 'variant')]//select[contains(@id, '{option_name}')]",
-                f"//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_name}')]",
-                f"//span[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value}')]",
-                
-                # Button and div selectors with expanded attributes
-                f"//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]",
-                f"//button[@role='option']//span[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]/ancestor::button",
-                f"//button[.//span[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]]",
-                f"//div[contains(@class, 'variant')]//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]",
-                
-                # Role-based selectors
-                f"//*[@role='option' and contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower()}')]",
-                f"//*[@role='option']//span[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value.lower}')]/ancestor::*[@role='option']",
-                
-                # Radio button selectors
-                f"//input[@type='radio' and (contains(@name, '{option_name}') or contains(@class, '{option_name}') or contains(@value, '{option_value}'))]",
-                f"//input[@type='radio' and contains(text(), '{option_value}')]",
-                
-                
-                # Custom attribute selectors
-                f"//*[@data-{option_name}='{option_value}']",
-                f"//*[@data-variant='{option_value}']",
-                f"//*[@data-option='{option_value}']",
-                f"//*[@data-selection='{option_value}']",
-                
-                # Nested selectors for complex structures
-                f"//div[contains(@class, 'variant-wrapper')]//div[contains(., '{option_value}')]",
-                f"//div[contains(@class, 'swatch')]//div[contains(., '{option_value}')]",
-                f"//div[contains(@class, 'option')]//div[contains(., '{option_value}')]",
-                
-                # Fallback selectors
-                f"//*[contains(@option-value, '{option_value}') or contains(@data-option-value, '{option_value}') or contains(@value, '{option_value}')]",
-                f"//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{option_value}')]",
+                template.substitute(name=option_name, value=option_value, value_lower=option_value.lower())
+                for template in _OPTION_XPATH_TEMPLATES
             ]
             
-            for selector in selectors:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                logger.info(f" selector: {selector}")
-                for element in elements:
+            # Try selectors that worked before on this page first, and skip the
+            # scan entirely if it recently found nothing
+            cache_key = f"{self.driver.current_url}::{option_name}::{option_value}"
+            cached = self._selector_cache.get(cache_key, [])
+            if isinstance(cached, tuple):
+                if time.monotonic() - cached[1] < _SELECTOR_MISS_TTL:
+                    logger.warning(f"Skipping option {option_name} with value {option_value}: no match on this page recently")
+                    return False
+                cached = []
+            selectors = cached + [selector for selector in selectors if selector not in cached]
+            
+            for selector, element, props in self._first_matching(selectors):
+                try:
+                    # Try to scroll element into view first
+                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+                    time.sleep(0.5)
                     
-                    try:
-                        # Try to scroll element into view first
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                        time.sleep(0.5)
-                        
-                        # Check if element is displayed or can be interacted with
-                        is_displayed = element.is_displayed()
-                        is_enabled = element.is_enabled()
-                        is_clickable = False
-                        
+                    # Check if element is displayed or can be interacted with
+                    is_displayed = props['displayed']
+                    is_enabled = props['enabled']
+                    
+                    # The clickability probe is only needed when the cheaper checks fail
+                    if is_displayed or is_enabled or self._is_clickable_sync(element):
                         try:
-                            # Try to check if element is clickable
-                            WebDriverWait(self.driver, 2).until(
-                                EC.element_to_be_clickable((By.XPATH, f"//*[@id='{element.get_attribute('id')}']"))
-                            )
-                            is_clickable = True
-                        except:
-                            pass
-                        
-                        if is_displayed or is_enabled or is_clickable:
-                            try:
-                                # If it's a select element
-                                if element.tag_name == 'select':
-                                    select = Select(element)
-                                    # Try exact match first
+                            # If it's a select element
+                            tag_name = props['tag']
+                            is_radio = tag_name == 'input' and props['type'] == 'radio'
+                            
+                            if tag_name == 'select':
+                                select = Select(element)
+                                # Try exact match first
+                                try:
+                                    select.select_by_value(option_value)
+                                except:
+                                    # Try case-insensitive text match over all option texts at once
+                                    options = self.driver.execute_script(_SELECT_OPTIONS_JS, element)
+                                    for index, (_, text) in enumerate(options):
+                                        if option_value.lower() in text.lower():
+                                            self.driver.execute_script(_SELECT_INDEX_JS, element, index)
+                                            break
+                            # If it's a button or div (likely a swatch or option tile)
+                            elif tag_name in ['button', 'div', 'span', 'label']:
+                                logger.info(f"Selecting option {option_name} with value {option_value} using <{tag_name}> element")
+                                # Only serialize the element when debug logging is actually enabled
+                                logger.opt(lazy=True).debug("Option element: {}", lambda: element.get_attribute('outerHTML'))
+                                # Try multiple click methods
+                                try:
+                                    # Try JavaScript click first
+                                    self.driver.execute_script("arguments[0].click();", element)
+                                except:
                                     try:
-                                        select.select_by_value(option_value)
+                                        # Try ActionChains click
+                                        ActionChains(self.driver).move_to_element(element).click().perform()
                                     except:
-                                        # Try case-insensitive text match
-                                        for option in select.options:
-                                            if option_value.lower() in option.text.lower():
-                                                select.select_by_visible_text(option.text)
-                                                break
-                                # If it's a button or div (likely a swatch or option tile)
-                                elif element.tag_name in ['button', 'div', 'span', 'label']:
-                                    logger.info(f"Selecting option {option_name} with value {option_value} using element {element.get_attribute('outerHTML')}")
-                                    # Try multiple click methods
+                                        # Try regular click
+                                        element.click()
+                            # If it's a radio button
+                            elif is_radio:
+                                if not props['selected']:
                                     try:
-                                        # Try JavaScript click first
                                         self.driver.execute_script("arguments[0].click();", element)
                                     except:
-                                        try:
-                                            # Try ActionChains click
-                                            ActionChains(self.driver).move_to_element(element).click().perform()
-                                        except:
-                                            # Try regular click
-                                            element.click()
-                                # If it's a radio button
-                                elif element.tag_name == 'input' and element.get_attribute('type') == 'radio':
-                                    if not element.is_selected():
-                                        try:
-                                            self.driver.execute_script("arguments[0].click();", element)
-                                        except:
-                                            element.click()
-                                
-                                # Wait for any dynamic updates
-                                await asyncio.sleep(1)
+                                        element.click()
+                            
+                            # Wait for any dynamic updates
+                            await asyncio.sleep(1)
+                            
+                            # Verify the selection was successful
+                            if tag_name == 'select':
+                                selected_option = Select(element).first_selected_option
+                                selected = option_value.lower() in selected_option.text.lower()
+                            elif is_radio:
+                                selected = element.is_selected()
+                            else:
+                                # For other elements, assume success if we got here
+                                selected = True
+                            
+                            if selected:
+                                self._remember_selector(cache_key, selector)
+                                return True
                                 
-                                # Verify the selection was successful
-                                if element.tag_name == 'select':
-                                    selected_option = Select(element).first_selected_option
-                                    if option_value.lower() in selected_option.text.lower():
-                                        return True
-                                elif element.tag_name == 'input' and element.get_attribute('type') == 'radio':
-                                    if element.is_selected():
-                                        return True
-                                else:
-                                    # For other elements, assume success if we got here
-                                    return True
-                                    
-                            except Exception as e:
-                                logger.debug(f"Error selecting option {option_name}: {e}")
-                                continue
-                    except Exception as e:
-                        logger.debug(f"Error with element for selector {selector}: {e}")
-                        continue
+                        except Exception as e:
+                            logger.debug(f"Error selecting option {option_name}: {e}")
+                            continue
+                except Exception as e:
+                    logger.debug(f"Error with element for selector {selector}: {e}")
+                    continue
             
+            self._selector_cache[cache_key] = (_SELECTOR_MISS, time.monotonic())
             logger.warning(f"Could not find or select option {option_name} with value {option_value}")
             return False
             
@@ -1016,6 +2778,124 @@ class WebScraper:
             return False
 
     
+    def _iter_button_candidates(self, button_types: List[str]):
+        """Lazily yield visible button candidates, fast-path hooks before generic matchers.
+        
+        The generic matchers are only evaluated once the caller has tried every
+        fast-path candidate without success, so a page with a well-known hook
+        never pays for the full scan.
+        
+        Args:
+            button_types: Button types to look for, highest priority first
+            
+        Yields:
+            Candidate dicts with type, selector, element, text and value keys
+        """
+        fast_groups = []
+        groups = []
+        for button_type in button_types:
+            if button_type not in _BUTTON_MATCHERS:
+                logger.warning(f"Unknown button type: {button_type}")
+                continue
+            if button_type in _BUTTON_FAST_PATH_CSS:
+                fast_groups.append({"type": button_type, "matchers": (("css", _BUTTON_FAST_PATH_CSS[button_type]),)})
+            groups.append({"type": button_type, "matchers": _BUTTON_MATCHERS[button_type]})
+        
+        tried = set()
+        for phase, phase_groups in (("fast-path", fast_groups), ("generic", groups)):
+            if not phase_groups:
+                continue
+            candidates = self._find_visible_buttons(phase_groups)
+            if candidates:
+                logger.info(f"Found {len(candidates)} visible {phase} candidate buttons")
+            for candidate in candidates:
+                if candidate["element"].id in tried:
+                    continue
+                tried.add(candidate["element"].id)
+                yield candidate
+    
+    def _find_visible_buttons(self, groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Find every visible element matching groups of button matchers in one page call.
+        
+        Args:
+            groups: Dicts with a button type and its matchers, highest priority first
+            
+        Returns:
+            One dict per visible match with type, selector, element, text and value keys
+        """
+        result = self.driver.execute_script(_CALL_FIND_VISIBLE_JS, groups)
+        if result is None:
+            result = self.driver.execute_script(_FIND_VISIBLE_JS, groups)
+        return result or []
+    
+    def _fill_frame_field(self, field, value: str) -> None:
+        """Fill a payment iframe field and wait until the widget has taken the value.
+        
+        Args:
+            field: Input element inside the current frame
+            value: Value to enter
+        """
+        self.driver.execute_script(_FILL_FRAME_FIELD_JS, field, value)
+        try:
+            WebDriverWait(self.driver, _FRAME_FIELD_TIMEOUT, poll_frequency=0.05).until(
+                lambda d: d.execute_script(_FRAME_FIELD_FILLED_JS, field, value)
+            )
+        except TimeoutException:
+            logger.debug("Payment iframe field did not report the entered value in time")
+    
+    def _evaluate(self, expression: str) -> Any:
+        """Evaluate a JavaScript expression in the top-level document over the DevTools protocol.
+        
+        For hot reads that only need a plain value back: skips WebDriver's script
+        wrapping and argument/element serialization.
+        
+        Args:
+            expression: JavaScript expression to evaluate
+            
+        Returns:
+            The expression's value as JSON-compatible Python data, or None if undefined
+            
+        Raises:
+            JavascriptException: If the expression throws
+        """
+        result = self.driver.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True
+        })
+        if result.get("exceptionDetails"):
+            raise JavascriptException(result["exceptionDetails"].get("text"))
+        return result.get("result", {}).get("value")
+    
+    def _payment_error_text(self) -> Optional[str]:
+        """Return the text of the most specific visible payment error on the page, if any.
+        
+        Returns:
+            The error text, or None if no error element is showing
+        """
+        try:
+            return self._evaluate(_PAYMENT_ERROR_TEXT_EXPR)
+        except Exception as e:
+            logger.debug(f"Error checking for error alerts: {e}")
+            return None
+    
+    def _uncheck_remember_checkboxes(self) -> int:
+        """Uncheck every visible "Remember me" / "Save information" checkbox in one page call.
+        
+        Returns:
+            Number of checkboxes unchecked
+        """
+        try:
+            labels = self.driver.execute_script(_UNCHECK_REMEMBER_JS) or []
+        except Exception as e:
+            logger.debug(f"Error handling remember/save checkboxes: {e}")
+            return 0
+        
+        for label_text in labels:
+            logger.info(f"Unchecking save/remember checkbox: {label_text}")
+        if labels:
+            self._wait_ready(timeout=2)
+        return len(labels)
+    
     async def find_and_click_button(self, button_types: List[str]) -> bool:
         """Find and click a button when URL doesn't change.
         
@@ -1031,226 +2911,79 @@ class WebScraper:
             
             logger.info(f"Looking for buttons of types: {button_types}")
             
-            # Common button selectors based on type
-            button_selectors = {
-                'add_to_cart': [
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'add to cart')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'add to cart')]",
-                    "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'add to cart')]",
-                    "//*[contains(@id, 'add-to-cart') or contains(@class, 'add-to-cart')]",
-                    "//*[contains(@id, 'addtocart') or contains(@class, 'addtocart')]"
-                ],
-                'checkout': [
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'checkout')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'checkout')]",
-                    "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'checkout')]",
-                    "//*[contains(@id, 'checkout') or contains(@class, 'checkout')]",
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'proceed to')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'proceed to')]"
-                ],
-                'view_cart': [
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view cart')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view cart')]",
-                    "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view cart')]",
-                    "//*[contains(@id, 'view-cart') or contains(@class, 'view-cart')]",
-                    "//*[contains(@id, 'viewcart') or contains(@class, 'viewcart')]",
-                    "//a[contains(@href, 'cart')]"
-                ],
-                'payment': [
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'pay')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'pay')]",
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continue')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continue')]",
-                    "//*[contains(@id, 'pay') or contains(@class, 'pay')]",
-                ],
-                'complete_order': [
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'place order')]",
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'complete order')]",
-                    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'submit order')]",
-                    "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'place order')]",
-                    "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'place order')]",
-                    "//*[contains(@id, 'place-order') or contains(@class, 'place-order')]",
-                    "//*[contains(@id, 'placeorder') or contains(@class, 'placeorder')]"
-                ]
-            }
-            
             # Check if we're looking for payment-related buttons
-            is_payment_button = any(btn_type in ['payment', 'complete_order'] for btn_type in button_types)
+            is_payment_button = not _PAYMENT_BUTTON_TYPES.isdisjoint(button_types)
             
-            # Try each button type
-            for button_type in button_types:
-                if button_type not in button_selectors:
-                    logger.warning(f"Unknown button type: {button_type}")
-                    continue
-                
-                # Try each selector for this button type
-                for selector in button_selectors[button_type]:
+            # Find and uncheck any "Remember me" or "Save information" checkboxes BEFORE clicking payment button
+            if is_payment_button:
+                self._uncheck_remember_checkboxes()
+            
+            # Fast-path hooks first; the generic matchers are only evaluated if those fail
+            visible_candidates = self._iter_button_candidates(button_types)
+            
+            # Only a successful click ends the loop, so the URL before clicking is
+            # the same for every candidate
+            old_url = self.driver.current_url
+            
+            # Try to click each visible element, in selector priority order
+            for candidate in visible_candidates:
+                button_type = candidate["type"]
+                element = candidate["element"]
+                try:
+                    element_text = candidate["text"] or candidate["value"] or "[No text]"
+                    logger.info(f"Clicking {button_type} button: '{element_text}'")
+                    
+                    # Try JavaScript scroll and click first
                     try:
-                        logger.info(f"Trying to find {button_type} button with selector: {selector}")
-                        
-                        # Find all matching elements
-                        elements = self.driver.find_elements(By.XPATH, selector)
+                        self.driver.execute_script(_SCROLL_AND_CLICK_JS, element)
+                    except JavascriptException:
+                        # Fall back to regular click
+                        element.click()
+                    
+                    # Wait for potential page load or error alerts
+                    self._wait_after_click(element, old_url)
+                    
+                    # If this is a payment-related button, check for error alerts
+                    if is_payment_button:
+                        logger.info("Checking for payment error alerts after clicking payment button")
                         
-                        # Filter for visible elements
-                        visible_elements = []
-                        for element in elements:
+                        # Read a JavaScript alert before anything else touches the page
+                        alert_text = self._take_alert()
+                        if alert_text is None:
+                            # A framework re-rendering the button (e.g. into a spinner)
+                            # ends the wait above before the payment response arrives
                             try:
-                                if element.is_displayed():
-                                    visible_elements.append(element)
-                            except StaleElementReferenceException:
-                                continue
+                                WebDriverWait(self.driver, _PAYMENT_SETTLE_TIMEOUT, poll_frequency=0.1).until(EC.any_of(
+                                    EC.alert_is_present(),
+                                    lambda d: d.execute_script(_PAGE_SETTLED_JS, _NETWORK_IDLE_MS)
+                                ))
+                            except TimeoutException:
+                                logger.debug(f"Page did not settle within {_PAYMENT_SETTLE_TIMEOUT}s of payment click")
+                            alert_text = self._take_alert()
                         
-                        if visible_elements:
-                            logger.info(f"Found {len(visible_elements)} visible {button_type} buttons")
-                            
-                            # Try to click each visible element
-                            for element in visible_elements:
-                                try:
-                                    # Scroll element into view
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                                    time.sleep(0.5)
-                                    
-                                    # Try to get element text for logging
-                                    try:
-                                        element_text = element.text.strip() or element.get_attribute("value") or "[No text]"
-                                        logger.info(f"Clicking {button_type} button: '{element_text}'")
-                                    except:
-                                        logger.info(f"Clicking {button_type} button (text unavailable)")
-                                    
-                                    # Try JavaScript click first
-                                    try:
-                                        self.driver.execute_script("arguments[0].click();", element)
-                                    except JavascriptException:
-                                        # Fall back to regular click
-                                        element.click()
-                                    
-                                    # Wait for potential page load or error alerts
-                                    time.sleep(3)
-                                    
-                                    # If this is a payment-related button, check for error alerts
-                                    if is_payment_button:
-                                        logger.info("Checking for payment error alerts after clicking payment button")
-                                        
-                                        # Check for error alerts
-                                        error_selectors = [
-                                            "//div[contains(@class, 'error') and contains(text(), 'payment')]",
-                                            "//div[contains(@class, 'alert') and contains(text(), 'payment')]",
-                                            "//div[contains(@class, 'error') and contains(text(), 'card')]",
-                                            "//div[contains(@class, 'alert') and contains(text(), 'card')]",
-                                            "//div[contains(@class, 'error') and contains(text(), 'declined')]",
-                                            "//div[contains(@class, 'alert') and contains(text(), 'declined')]",
-                                            "//div[contains(@class, 'error') and contains(text(), 'failed')]",
-                                            "//div[contains(@class, 'alert') and contains(text(), 'failed')]",
-                                            "//div[contains(@class, 'error')]",
-                                            "//div[contains(@class, 'alert')]",
-                                            "//p[contains(@class, 'error')]",
-                                            "//span[contains(@class, 'error')]",
-                                            "//*[contains(text(), 'payment declined')]",
-                                            "//*[contains(text(), 'card declined')]",
-                                            "//*[contains(text(), 'payment failed')]",
-                                            "//*[contains(text(), 'transaction failed')]",
-                                            "//*[contains(text(), 'invalid card')]"
-                                        ]
-                                        
-                                        for error_selector in error_selectors:
-                                            try:
-                                                error_elements = self.driver.find_elements(By.XPATH, error_selector)
-                                                for error_element in error_elements:
-                                                    if error_element.is_displayed():
-                                                        error_text = error_element.text.strip()
-                                                        if error_text:
-                                                            logger.error(f"Payment error alert detected: {error_text}")
-                                                            # Return special value to indicate payment error
-                                                            self.driver.execute_script(f"""
-                                                            console.error("Payment error alert detected: {error_text}");
-                                                            window.paymentErrorDetected = "{error_text}";
-                                                            """)
-                                                            return True
-                                            except Exception as e:
-                                                logger.debug(f"Error checking for error alerts with selector {error_selector}: {e}")
-                                        
-                                        # Check for JavaScript alerts
-                                        try:
-                                            alert = self.driver.switch_to.alert
-                                            alert_text = alert.text
-                                            logger.info(f"Alert detected after payment: {alert_text}")
-                                            
-                                            # Check if it's an error alert
-                                            error_keywords = [
-                                                "invalid payment", "payment failed", "payment error", 
-                                                "system error", "error", "failed", "declined", 
-                                                "invalid card", "card declined", "transaction failed"
-                                            ]
-                                            
-                                            is_error_alert = any(keyword.lower() in alert_text.lower() for keyword in error_keywords)
-                                            
-                                            if is_error_alert:
-                                                logger.error(f"Payment error alert detected: {alert_text}")
-                                                # Accept the alert
-                                                alert.accept()
-                                                # Return special value to indicate payment error
-                                                self.driver.execute_script(f"""
-                                                console.error("Payment error alert detected: {alert_text}");
-                                                window.paymentErrorDetected = "{alert_text}";
-                                                """)
-                                                return True
-                                            
-                                            # Accept the alert if it's not an error
-                                            alert.accept()
-                                        except:
-                                            # No alert present
-                                            pass
-                                    
-                                    # Find and uncheck any "Remember me" or "Save information" checkboxes BEFORE clicking payment button
-                                    remember_selectors = [
-                                        "//input[@type='checkbox' and (contains(@id, 'remember') or contains(@name, 'remember') or contains(@class, 'remember'))]",
-                                        "//input[@type='checkbox' and (contains(@id, 'save') or contains(@name, 'save') or contains(@class, 'save'))]",
-                                        "//input[@type='checkbox' and (contains(@id, 'store') or contains(@name, 'store') or contains(@class, 'store'))]",
-                                        "//input[@type='checkbox' and (contains(translate(@id, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'remember'))]",
-                                        "//input[@type='checkbox' and (contains(translate(@name, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'remember'))]",
-                                        "//input[@type='checkbox' and (contains(translate(@id, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'save'))]",
-                                        "//input[@type='checkbox' and (contains(translate(@name, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'save'))]",
-                                        "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'remember')]//input[@type='checkbox']",
-                                        "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'save')]//input[@type='checkbox']"
-                                    ]
-                                    
-                                    checkboxes_unchecked = 0
-                                    for selector in remember_selectors:
-                                        try:
-                                            elements = self.driver.find_elements(By.XPATH, selector)
-                                            for element in elements:
-                                                if element.is_displayed() and element.is_selected():
-                                                    # Get checkbox label for logging
-                                                    try:
-                                                        label_text = "Unknown"
-                                                        label_id = element.get_attribute("id")
-                                                        if label_id:
-                                                            label_elem = self.driver.find_element(By.XPATH, f"//label[@for='{label_id}']")
-                                                            if label_elem:
-                                                                label_text = label_elem.text.strip()
-                                                        if not label_text or label_text == "Unknown":
-                                                            parent = self.driver.find_element(By.XPATH, f"//input[@id='{label_id}']/parent::*")
-                                                            if parent:
-                                                                label_text = parent.text.strip()
-                                                    except:
-                                                        pass
-                                                    
-                                                    logger.info(f"Unchecking save/remember checkbox: {label_text}")
-                                                    try:
-                                                        self.driver.execute_script("arguments[0].click();", element)
-                                                    except:
-                                                        element.click()
-                                                    checkboxes_unchecked += 1
-                                                    time.sleep(0.5)
-                                        except Exception as e:
-                                            logger.debug(f"Error handling remember/save checkbox with selector {selector}: {e}")    
-                                    return True
-                                except (ElementClickInterceptedException, StaleElementReferenceException) as e:
-                                    logger.warning(f"Could not click element: {e}")
-                                    continue
-                    except Exception as e:
-                        logger.warning(f"Error finding {button_type} button with selector {selector}: {e}")
-                        continue
+                        if alert_text is not None:
+                            logger.info(f"Alert detected after payment: {alert_text}")
+                            if _ALERT_ERROR_RE.search(alert_text):
+                                logger.error(f"Payment error alert detected: {alert_text}")
+                                # Return special value to indicate payment error
+                                self.driver.execute_script(_RECORD_PAYMENT_ERROR_JS, alert_text)
+                                return True
+                        
+                        # Check for error alerts
+                        error_text = self._payment_error_text()
+                        if error_text:
+                            logger.error(f"Payment error alert detected: {error_text}")
+                            # Return special value to indicate payment error
+                            self.driver.execute_script(_RECORD_PAYMENT_ERROR_JS, error_text)
+                            return True
+                    
+                    return True
+                except (ElementClickInterceptedException, StaleElementReferenceException) as e:
+                    logger.warning(f"Could not click element: {e}")
+                    continue
+                except Exception as e:
+                    logger.warning(f"Error clicking {button_type} button matched by {candidate['selector']}: {e}")
+                    continue
             
             logger.warning(f"No {' or '.join(button_types)} buttons found or clickable")
             return False
@@ -1259,11 +2992,27 @@ class WebScraper:
             logger.error(f"Error in find_and_click_button: {e}")
             return False
     
-    async def detect_form_fields(self) -> Dict[str, List[str]]:
+    @staticmethod
+    def _field_role(field_type: str, key: str) -> Optional[str]:
+        """Pick the user data role of a field from its lowercased id and name.
+        
+        Args:
+            field_type: Field type the field was classified as
+            key: Lowercased id and name of the field
+            
+        Returns:
+            The role from _FIELD_ROLE_RULES, or None if no rule matches
+        """
+        for role, any_of, none_of in _FIELD_ROLE_RULES.get(field_type, ()):
+            if any(word in key for word in any_of) and not any(word in key for word in none_of):
+                return role
+        return None
+    
+    async def detect_form_fields(self) -> Dict[str, List[Dict[str, str]]]:
         """Detect form fields on the page to determine if it's a checkout or payment page.
         
         Returns:
-            Dictionary with field types and their selectors
+            Dictionary with field types and the id/name/role records of their fields
         """
         try:
             if not self.driver:
@@ -1271,6 +3020,14 @@ class WebScraper:
             
             logger.info("Detecting form fields on the page")
             
+            # Read every form control's identifying text in one call, unless the
+            # controls are the same as at the last detection
+            cached_signature = self._form_fields_cache[0] if self._form_fields_cache else None
+            result = self.driver.execute_script(_FORM_FIELDS_JS, cached_signature)
+            if result is None and self._form_fields_cache:
+                logger.info("Form fields unchanged since last detection, reusing result")
+                return {field_type: list(records) for field_type, records in self._form_fields_cache[1].items()}
+            
             field_types = {
                 "billing": [],
                 "shipping": [],
@@ -1281,69 +3038,48 @@ class WebScraper:
             }
             logger.info(f"Field types: {field_types}")
             
-            # Common field identifiers with expanded patterns
-            field_identifiers = {
-                "billing": ["billing", "bill to", "bill address", "billing address", "bill information"],
-                "shipping": ["shipping", "ship to", "delivery", "shipping address", "ship address", "delivery address", "recipient"],
-                "payment": ["payment", "card", "credit", "cvv", "cvc", "expir", "expiry", "expiration", "card number", "cardholder", "security code", "payment method"],
-                "contact": ["email", "phone", "contact", "mobile", "telephone", "e-mail", "customer", "account"]
-            }
+            fields = (result or {}).get("fields", [])
             
-            # Find all input fields
-            input_elements = self.driver.find_elements(By.XPATH, "//input | //select | //textarea")
+            # (id, name) pairs already recorded per type, for constant-time dedup
+            seen = {field_type: set() for field_type in field_types}
             
-            for element in input_elements:
-                try:
-                    # Get element attributes
-                    element_id = element.get_attribute("id") or ""
-                    element_name = element.get_attribute("name") or ""
-                    element_class = element.get_attribute("class") or ""
-                    element_placeholder = element.get_attribute("placeholder") or ""
-                    element_label = ""
-                    
-                    # Try to find associated label
-                    try:
-                        label_for = self.driver.find_element(By.XPATH, f"//label[@for='{element_id}']")
-                        element_label = label_for.text.strip()
-                    except:
-                        pass
-                    
-                    # Combine all text for matching
-                    all_text = (element_id + " " + element_name + " " + element_class + " " + 
-                               element_placeholder + " " + element_label).lower()
-                    
-                    # Flag to track if field type was identified
-                    field_type_found = False
-                    
-                    # Check which type of field it is
-                    for field_type, identifiers in field_identifiers.items():
-                        for identifier in identifiers:
-                            if identifier.lower() in all_text:
-                                field_selector = f"document.querySelector('[id=\"{element_id}\"]') || document.querySelector('[name=\"{element_name}\"]')"
-                                if field_selector not in field_types[field_type]:
-                                    field_types[field_type].append(field_selector)
-                                break
-                except:
-                    continue
+            for field in fields:
+                element_id = field["id"]
+                element_name = field["name"]
+                
+                # Combine all text for matching
+                all_text = " ".join((element_id, element_name, field["cls"], field["ph"], field["label"])).lower()
+                
+                # Check which type of field it is
+                for field_type, identifier_re in _FIELD_IDENTIFIER_RES.items():
+                    if identifier_re.search(all_text) and (element_id, element_name) not in seen[field_type]:
+                        seen[field_type].add((element_id, element_name))
+                        field_types[field_type].append({
+                            "id": element_id,
+                            "name": element_name,
+                            "role": self._field_role(field_type, f"{element_id} {element_name}".lower())
+                        })
             
             # Log results
-            for field_type, selectors in field_types.items():
-                if selectors:
-                    logger.info(f"Found {len(selectors)} {field_type} fields")
+            for field_type, records in field_types.items():
+                if records:
+                    logger.info(f"Found {len(records)} {field_type} fields")
                 else:
                     logger.info(f"No {field_type} fields found")
             
-            return field_types
+            if result:
+                self._form_fields_cache = (result["signature"], field_types)
+            return {field_type: list(records) for field_type, records in field_types.items()}
         
         except Exception as e:
             logger.error(f"Error detecting form fields: {e}")
             return {"billing": [], "shipping": [], "payment": [], "contact": [], "unknown": []}
     
-    def fill_form_fields(self, field_types: Dict[str, List[str]]) -> bool:
+    def fill_form_fields(self, field_types: Dict[str, List[Dict[str, str]]]) -> bool:
         """Fill form fields with user data.
         
         Args:
-            field_types: Dictionary with field types and selectors
+            field_types: Dictionary with field types and the id/name/role records of their fields
             
         Returns:
             True if fields were filled, False otherwise
@@ -1355,365 +3091,71 @@ class WebScraper:
             
             logger.info(f"Filling form fields with user data from MongoDB")
             
-            # Convert user data to JavaScript
-            user_data_js = json.dumps(self.user_data)
-            
-            # Create JavaScript to fill the fields with improved automation
-            fill_script = f"""
-            const userData = {user_data_js};
-            let filledFields = 0;
-            
-            console.log('Starting enhanced form automation...');
-            
-            // Helper function to fill an input field with enhanced framework support
-            function fillField(selector, value) {{
-                const field = eval(selector);
-                if (field) {{
-                    if (field.tagName === 'SELECT') {{
-                        // Handle select fields
-                        const options = field.options;
-                        for (let i = 0; i < options.length; i++) {{
-                            const optionText = options[i].text.toLowerCase();
-                            const optionValue = options[i].value.toLowerCase();
-                            const valueToMatch = value.toLowerCase();
-                            
-                            if (optionText.includes(valueToMatch) || optionValue.includes(valueToMatch)) {{
-                                field.selectedIndex = i;
-                                field.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                filledFields++;
-                                return true;
-                            }}
-                        }}
-                        return false;
-                    }} else {{
-                        // Enhanced input field handling
-                        try {{
-                            // Try to clear any existing value trackers (React)
-                            if (field._valueTracker) {{
-                                field._valueTracker.setValue('');
-                            }}
-                            
-                            // Try React event handlers
-                            if (field.__reactEventHandlers) {{
-                                field.__reactEventHandlers.onChange({{target: {{value: value}}}});
-                            }}
-                            
-                            // Use native input value setter for framework compatibility
-                            const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
-                            nativeInputValueSetter.call(field, value);
-                            
-                            // Dispatch multiple events for framework detection
-                            field.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                            field.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                            field.dispatchEvent(new Event('blur', {{ bubbles: true }}));
-                            
-                            filledFields++;
-                            return true;
-                        }} catch (e) {{
-                            console.error('Error filling field:', e);
-                            // Fallback to basic value setting
-                            field.value = value;
-                            field.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                            field.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                            filledFields++;
-                            return true;
-                        }}
-                    }}
-                }}
-                return false;
-            }}
-            
-            // Enhanced email field detection
-            const emailSelectors = [
-                'input[name="email"]',
-                'input[type="email"]',
-                'input[autocomplete="email"]',
-                'input.email',
-                'input#email'
-            ];
-            
-            let emailField = null;
-            for (const selector of emailSelectors) {{
-                emailField = document.querySelector(selector);
-                if (emailField) {{
-                    console.log(`Found email input using selector: ${{selector}}`);
-                    fillField(`document.querySelector('${{selector}}')`, userData.email);
-                    break;
-                }}
-            }}
-            
-            // Enhanced name field handling
-            const nameSelectors = [
-                'input[name="fullName"]',
-                'input[name="full_name"]',
-                'input[name="name"]',
-                'input[autocomplete="name"]',
-                'input.full-name',
-                'input#fullName',
-                'input#full_name',
-                'input#name'
-            ];
-            
-            let nameField = null;
-            for (const selector of nameSelectors) {{
-                nameField = document.querySelector(selector);
-                if (nameField) {{
-                    console.log(`Found name input using selector: ${{selector}}`);
-                    fillField(`document.querySelector('${{selector}}')`, userData.first_name + ' ' + userData.last_name);
-                    break;
-                }}
-            }}
-            
-            // Fill billing fields
-            for (const selector of {json.dumps(field_types['billing'])}) {{
-                // Try full name field first
-                if (selector.toLowerCase().includes('full_name') || 
-                    (selector.toLowerCase().includes('name') && 
-                    !selector.toLowerCase().includes('first') && 
-                    !selector.toLowerCase().includes('last') && 
-                    !selector.toLowerCase().includes('user'))) {{
-                    fillField(selector, userData.first_name + ' ' + userData.last_name); 
-                    setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('first') || selector.toLowerCase().includes('name') && !selector.toLowerCase().includes('last')) {{
-                    fillField(selector, userData.first_name); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('last')) {{
-                    fillField(selector, userData.last_name); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('address') || selector.toLowerCase().includes('street')) {{
-                    fillField(selector, userData.address.street); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('address2') || selector.toLowerCase().includes('apt')) {{
-                    fillField(selector, userData.address.apt); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('city')) {{
-                    fillField(selector, userData.address.city); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('state') || selector.toLowerCase().includes('province')) {{
-                    fillField(selector, userData.address.state); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('zip') || selector.toLowerCase().includes('postal')) {{
-                    fillField(selector, userData.address.zip); setTimeout(() => {{}}, 1000);
-                }} else if (selector.toLowerCase().includes('country')) {{
-                    fillField(selector, userData.address.country); setTimeout(() => {{}}, 1000);
-                }}
-            }}
-            
-            // Find shipping form container
-            const shippingContainers = document.querySelectorAll('form, div, section, fieldset');
-            let shippingForm = null;
-            
-            for (const container of shippingContainers) {{
-                const containerText = container.textContent.toLowerCase();
-                if (containerText.includes('shipping') || containerText.includes('ship to') || 
-                    containerText.includes('delivery')) {{
-                    shippingForm = container;
-                    break;
-                }}
-            }}
-            
-            if (shippingForm) {{
-                // Find all input elements within shipping form
-                const inputs = shippingForm.querySelectorAll('input, select, textarea');
-                
-                for (const input of inputs) {{
-                    const inputName = (input.name || input.id || '').toLowerCase();
-                    const inputType = input.type.toLowerCase();
-                    
-                    if (inputName.includes('first') || (inputName.includes('name') && !inputName.includes('last'))) {{
-                        fillField(input, userData.first_name);
-                    }} else if (inputName.includes('last')) {{
-                        fillField(input, userData.last_name);
-                    }} else if (inputName.includes('address') || inputName.includes('street')) {{
-                        fillField(input, userData.address.street);
-                    }} else if (inputName.includes('address2') || inputName.includes('apt')) {{
-                        fillField(input, userData.address.apt);
-                    }} else if (inputName.includes('city')) {{
-                        fillField(input, userData.address.city);
-                    }} else if (inputName.includes('state') || inputName.includes('province')) {{
-                        fillField(input, userData.address.state);
-                    }} else if (inputName.includes('zip') || inputName.includes('postal')) {{
-                        fillField(input, userData.address.zip);
-                    }} else if (inputName.includes('country')) {{
-                        fillField(input, userData.address.country);
-                    }}
-                }}
-            }}
-            
-            // Fill contact fields
-            for (const selector of {json.dumps(field_types['contact'])}) {{
-                if (selector.toLowerCase().includes('email')) {{
-                    fillField(selector, userData.email);
-                }} else if (selector.toLowerCase().includes('phone')) {{
-                    fillField(selector, userData.phone);
-                }}
-            }}
-            
-            // Check "same as shipping" checkbox if billing is same as shipping
-            for (const selector of {json.dumps(field_types.get('same_as_shipping', []))}) {{
-                const checkbox = eval(selector);
-                if (checkbox) {{
-                    checkbox.checked = true;
-                    checkbox.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                    filledFields++;
-                }}
-            }}
-            
-            // Try to inject a script into the page context for enhanced framework support
-            try {{
-                const scriptElement = document.createElement('script');
-                scriptElement.textContent = `
-                    (function() {{
-                        // This runs in the page context, not in the console sandbox
-                        const nameField = document.querySelector('input[name="fullName"]');
-                        const emailField = document.querySelector('input[name="email"]') || 
-                                        document.querySelector('input[type="email"]');
-                        
-                        if (nameField) {{
-                            // Try to set value through any custom property or method
-                            if (nameField._valueTracker) nameField._valueTracker.setValue('');
-                            if (nameField.__reactEventHandlers) nameField.__reactEventHandlers.onChange({{target: {{value: '${{userData.first_name}} ${{userData.last_name}}'}}}});
-                            
-                            const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
-                            nativeInputValueSetter.call(nameField, '${{userData.first_name}} ${{userData.last_name}}');
-                            nameField.dispatchEvent(new Event('input', {{bubbles: true}}));
-                        }}
-                        
-                        if (emailField) {{
-                            if (emailField._valueTracker) emailField._valueTracker.setValue('');
-                            if (emailField.__reactEventHandlers) emailField.__reactEventHandlers.onChange({{target: {{value: '${{userData.email}}'}}}});
-                            
-                            const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
-                            nativeInputValueSetter.call(emailField, '${{userData.email}}');
-                            emailField.dispatchEvent(new Event('input', {{bubbles: true}}));
-                        }}
-                    }})();
-                `;
-                document.body.appendChild(scriptElement);
-                document.body.removeChild(scriptElement);
-            }} catch (e) {{
-                console.log('Enhanced framework support injection failed:', e);
-            }}
-            
-            return filledFields;
-            """
-
-            filled_fields = self.driver.execute_script(fill_script)
+            filled_fields = self.driver.execute_script(_FILL_SCRIPT, self._user_data_args(), field_types)
 
+            # Whether the driver is inside a payment iframe, so the default content
+            # is only restored after a switch that actually happened
+            in_frame = False
             try:
-                # First look for all possible Stripe iframes
-                stripe_iframes = self.driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    "iframe[name^='__privateStripeFrame'], iframe.stripe-element, iframe.card-fields-iframe"
-                )
+                # First look for all possible Stripe iframes; hidden ones (collapsed
+                # payment methods, unused elements) are never entered
+                stripe_iframes = self.driver.execute_script(_VISIBLE_ENABLED_JS, _PAYMENT_IFRAME_CSS) or []
                 
                 iframe_found = False
                 if stripe_iframes:
                     logger.info(f"Found {len(stripe_iframes)} potential payment iframes")
                     
-                    # Define field types and their selectors
-                    field_selectors = {
-                        'card': {
-                            'selectors': "input[name='number'], input[name='cardnumber'], input[autocomplete='cc-number'],input[data-elements-stable-field-name='cardNumber']",
-                            'value': self.user_data['payment_method']['card_number']
-                        },
-                        'expiry': {
-                            'selectors': "input[name='exp-date'], input[name='expiry'], input[data-elements-stable-field-name='cardExpiry'], input[autocomplete='cc-exp']",
-                            'value': f"{self.user_data['payment_method']['expiry_month']}/{self.user_data['payment_method']['expiry_year'][-2:]}"
-                        },
-                        'cvv': {
-                            'selectors': "input[name='verification_value'], input[name='cvc'], input[autocomplete='cc-csc'], input[data-elements-stable-field-name='cardCvc']",
-                            'value': self.user_data['payment_method']['cvv']
-                        },
-                        'name': {
-                            'selectors': "input[name='name'], input[name='cardholder-name'], input[name='cardholder'], input[name='nameOnAccount'], input[data-elements-stable-field-name='cardHolder'], input[autocomplete='cc-name']",
-                            'value': self.user_data['payment_method']['card_holder']
-                        }
+                    payment_method = self.user_data['payment_method']
+                    field_values = {
+                        'card': payment_method['card_number'],
+                        'expiry': f"{payment_method['expiry_month']}/{payment_method['expiry_year'][-2:]}",
+                        'cvv': payment_method['cvv'],
+                        'name': payment_method['card_holder']
                     }
-
-                    # Try single iframe approach first
+                    card_field_found = False  # Track if we've already found a card field
+                    filled_types = set()
+                    
+                    # Enter each iframe once, look up every field type in one call and
+                    # fill what it hosts before switching back out
                     for iframe in stripe_iframes:
+                        to_fill = []
                         try:
                             self.driver.switch_to.frame(iframe)
-                            card_input = self.driver.find_element(By.CSS_SELECTOR, field_selectors['card']['selectors'])
-                            cvv_input = self.driver.find_element(By.CSS_SELECTOR, field_selectors['cvv']['selectors'])
-                            if card_input and cvv_input:
-                                iframe_found = True
+                            in_frame = True
+                            present = self.driver.execute_script(_FRAME_FIELDS_JS, _PAYMENT_FRAME_FIELD_CSS) or {}
+                            present = {field_type: field for field_type, field in present.items() if field is not None}
+                            
+                            if 'card' in present and 'cvv' in present:
+                                # Single iframe hosting the whole card form
                                 logger.info("Found single iframe with all fields")
-                                break
+                                to_fill = list(present)
+                            else:
+                                # Separate iframe per field: fill the first field it hosts; a
+                                # second card-like iframe after the card number is the expiry
+                                to_fill = [
+                                    field_type for field_type in present
+                                    if not (field_type == 'card' and card_field_found)
+                                ][:1]
+                            
+                            for field_type in to_fill:
+                                logger.info(f"Found {field_type} field in payment iframe")
+                                self._fill_frame_field(present[field_type], field_values[field_type])
+                                iframe_found = True
+                                filled_types.add(field_type)
+                                if field_type == 'card':
+                                    card_field_found = True
                         except Exception as e:
-                            logger.debug(f"Single iframe approach failed: {e}")
-                            self.driver.switch_to.default_content()
-                            iframe_found = False
-                            continue
-                    if iframe_found:
-                        for field_type, field_info in field_selectors.items():
-                            try:
-                                field = WebDriverWait(self.driver, 10).until(
-                                    EC.presence_of_element_located((By.CSS_SELECTOR, field_info['selectors']))
-                                )
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
-                                time.sleep(0.3)
-                                self.driver.execute_script("arguments[0].focus(); arguments[0].click();", field)
-                                time.sleep(0.3)
-                                self.driver.execute_script("arguments[0].value = '';", field)
-                                time.sleep(0.3)
-                                self.driver.execute_script("""
-                                    arguments[0].value = arguments[1];
-                                    arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
-                                    arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
-                                """, field, field_info['value'])
-                                time.sleep(0.3)
-                            except Exception as e:
-                                logger.debug(f"Error filling {field_type} field: {e}")
-                                iframe_found = False
+                            logger.debug(f"Error filling payment iframe: {e}")
+                        finally:
+                            if in_frame:
                                 self.driver.switch_to.default_content()
-                                break
-                    # If single iframe approach failed, try multiple iframes approach
-                    if not iframe_found:
-                        logger.info("Single iframe approach failed, trying multiple iframes")
-                        card_field_found = False  # Track if we've already found a card field
+                                in_frame = False
                         
-                        for iframe in stripe_iframes:
-                            try:
-                                self.driver.switch_to.frame(iframe)
-                                for field_type, field_info in field_selectors.items():
-                                    try:
-                                        # Special handling for card fields
-                                        if field_type == 'card':
-                                            if card_field_found:
-                                                field = self.driver.find_element(By.CSS_SELECTOR, field_selectors['expiry']['selectors'])
-                                                # If we already found a card field, this is likely an expiry field
-                                                logger.info("Found second card field, treating as expiry field")
-                                                raw_value = f"{self.user_data['payment_method']['expiry_month']}/{self.user_data['payment_method']['expiry_year'][-2:]}"
-                                            else:
-                                                field = self.driver.find_element(By.CSS_SELECTOR, field_info['selectors'])
-                                                raw_value = field_info['value']
-                                                card_field_found = True
-                                        else:
-                                            field = self.driver.find_element(By.CSS_SELECTOR, field_info['selectors'])
-                                            raw_value = field_info['value']
-                                            
-                                        logger.info(f"Found {field_type} field in separate iframe")
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
-                                        time.sleep(0.3)
-                                        self.driver.execute_script("arguments[0].focus(); arguments[0].click();", field)
-                                        time.sleep(0.3)
-                                        self.driver.execute_script("arguments[0].value = '';", field)
-                                        time.sleep(0.3)
-                                        self.driver.execute_script("""
-                                            arguments[0].value = arguments[1];
-                                            arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
-                                            arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
-                                            // Move focus to body element after setting value
-                                            document.body.focus();
-                                            // Dispatch blur event on the field
-                                            arguments[0].dispatchEvent(new Event('blur', { bubbles: true }));
-                                        """, field, raw_value)
-                                        time.sleep(0.3)  # Give time for events to process
-                                        iframe_found = True
-                                        break
-                                    except:
-                                        pass
-                                self.driver.switch_to.default_content()
-                            except Exception as e:
-                                logger.debug(f"Error in multiple iframe approach: {e}")
-                                self.driver.switch_to.default_content()
-
+                        # A single iframe with the whole card form needs no further frames,
+                        # nor does anything once every field type has been filled
+                        if len(to_fill) > 1 or len(filled_types) == len(_PAYMENT_FRAME_FIELD_CSS):
+                            break
+                    
                     if iframe_found:
                         logger.info("Successfully filled Stripe payment fields")
                     else:
@@ -1723,7 +3165,8 @@ class WebScraper:
 
             except Exception as e:
                 logger.error(f"Error filling payment form: {e}")
-                self.driver.switch_to.default_content()
+                if in_frame:
+                    self.driver.switch_to.default_content()
                 return None
 
             logger.info(f"Filled {filled_fields} form fields with user data from MongoDB")
@@ -1751,129 +3194,39 @@ class WebScraper:
             logger.info("Executing action in browser with user data")
             initial_url = self.driver.current_url
             
-            # Inject user data into the action code
-            user_data_js = json.dumps(self.user_data)
-            logger.info("Injecting user data into automation code")
-            
-            # Create JavaScript with user data and null checks
-            action_with_data = f"""
-            // User data
-            const userData = {user_data_js};
-            
-            // Add null checks for all user data properties
-            const safeUserData = {{
-                email: userData.email || '',
-                first_name: userData.first_name || '',
-                last_name: userData.last_name || '',
-                phone: userData.phone || '',
-                address: {{
-                    street: (userData.address && userData.address.street) || '',
-                    apt: (userData.address && userData.address.apt) || '',
-                    city: (userData.address && userData.address.city) || '',
-                    state: (userData.address && userData.address.state) || '',
-                    zip: (userData.address && userData.address.zip) || '',
-                    country: (userData.address && userData.address.country) || ''
-                }},
-                payment_method: {{
-                    card_number: (userData.payment_method && userData.payment_method.card_number) || '',
-                    expiry_month: (userData.payment_method && userData.payment_method.expiry_month) || '',
-                    expiry_year: (userData.payment_method && userData.payment_method.expiry_year) || '',
-                    cvv: (userData.payment_method && userData.payment_method.cvv) || ''
-                }}
-            }};
-            
-            // Log that we're using the data (will appear in browser console)
-            console.log('Using user data:', {{
-                email: safeUserData.email,
-                name: safeUserData.first_name + ' ' + safeUserData.last_name,
-                address: safeUserData.address.city + ', ' + safeUserData.address.state,
-                payment: safeUserData.payment_method.card_number ? ('****' + safeUserData.payment_method.card_number.slice(-4)) : ''
-            }});
-            
-            // Execute the automation code with both userData and safeUserData available
-            try {{
-                {action_code}
-            }} catch (error) {{
-                console.error('Error executing automation code:', error);
-                // Try to continue despite errors
-            }}
-            """
-            
-            # Execute the action with safe user data
+            # Wrap the action code with the user data, passed as an argument
             logger.info("Executing JavaScript with safe user data")
-            self.driver.execute_script(action_with_data)
+            self.driver.execute_script(
+                _ACTION_PREFIX_JS + action_code + _ACTION_SUFFIX_JS,
+                self._user_data_args()
+            )
             
             # Wait for page to load after action
-            time.sleep(5)
+            self._wait_after_action(initial_url)
+            
+            # Check for JavaScript alerts before any script or CDP call, which
+            # would have chromedriver dismiss the alert
+            alert_text = self._take_alert()
+            if alert_text is not None:
+                logger.info(f"Alert detected: {alert_text}")
+                if _ALERT_ERROR_RE.search(alert_text):
+                    logger.error(f"Payment error alert detected: {alert_text}")
+                    return f"error://payment_failed?message={alert_text}"
             
             # Check if a payment error was detected in the JavaScript code
             try:
-                payment_error = self.driver.execute_script("return window.paymentErrorDetected;")
+                payment_error = self._evaluate("window.paymentErrorDetected")
                 if payment_error:
                     logger.error(f"Payment error alert detected by JavaScript: {payment_error}")
                     return f"error://payment_failed?message={payment_error}"
-            except:
-                pass
+            except WebDriverException as e:
+                logger.debug(f"Error reading JavaScript payment error flag: {e}")
             
             # Check for payment error alerts
-            error_selectors = [
-                "//div[contains(@class, 'error') and contains(text(), 'payment')]",
-                "//div[contains(@class, 'alert') and contains(text(), 'payment')]",
-                "//div[contains(@class, 'error') and contains(text(), 'card')]",
-                "//div[contains(@class, 'alert') and contains(text(), 'card')]",
-                "//div[contains(@class, 'error') and contains(text(), 'declined')]",
-                "//div[contains(@class, 'alert') and contains(text(), 'declined')]",
-                "//div[contains(@class, 'error') and contains(text(), 'failed')]",
-                "//div[contains(@class, 'alert') and contains(text(), 'failed')]",
-                "//div[contains(@class, 'error')]",
-                "//div[contains(@class, 'alert')]",
-                "//p[contains(@class, 'error')]",
-                "//span[contains(@class, 'error')]",
-                "//*[contains(text(), 'payment declined')]",
-                "//*[contains(text(), 'card declined')]",
-                "//*[contains(text(), 'payment failed')]",
-                "//*[contains(text(), 'transaction failed')]",
-                "//*[contains(text(), 'invalid card')]"
-            ]
-            
-            for error_selector in error_selectors:
-                try:
-                    error_elements = self.driver.find_elements(By.XPATH, error_selector)
-                    for error_element in error_elements:
-                        if error_element.is_displayed():
-                            error_text = error_element.text.strip()
-                            if error_text:
-                                logger.error(f"Payment error alert detected: {error_text}")
-                                return f"error://payment_failed?message={error_text}"
-                except Exception as e:
-                    logger.debug(f"Error checking for error alerts with selector {error_selector}: {e}")
-            
-            # Check for JavaScript alerts
-            try:
-                alert = self.driver.switch_to.alert
-                alert_text = alert.text
-                logger.info(f"Alert detected: {alert_text}")
-                
-                # Check if it's an error alert
-                error_keywords = [
-                    "invalid payment", "payment failed", "payment error", 
-                    "system error", "error", "failed", "declined", 
-                    "invalid card", "card declined", "transaction failed"
-                ]
-                
-                is_error_alert = any(keyword.lower() in alert_text.lower() for keyword in error_keywords)
-                
-                if is_error_alert:
-                    logger.error(f"Payment error alert detected: {alert_text}")
-                    # Accept the alert
-                    alert.accept()
-                    return f"error://payment_failed?message={alert_text}"
-                
-                # Accept the alert if it's not an error
-                alert.accept()
-            except:
-                # No alert present
-                pass
+            error_text = self._payment_error_text()
+            if error_text:
+                logger.error(f"Payment error alert detected: {error_text}")
+                return f"error://payment_failed?message={error_text}"
             
             # Get the current URL (might have changed due to action)
             current_url = self.driver.current_url
@@ -1891,53 +3244,10 @@ class WebScraper:
                     self.fill_form_fields(field_types)
                     
                     # Find and uncheck any "Remember me" or "Save information" checkboxes BEFORE clicking payment button
-                    remember_selectors = [
-                        "//input[@type='checkbox' and (contains(@id, 'remember') or contains(@name, 'remember') or contains(@class, 'remember'))]",
-                        "//input[@type='checkbox' and (contains(@id, 'save') or contains(@name, 'save') or contains(@class, 'save'))]",
-                        "//input[@type='checkbox' and (contains(@id, 'store') or contains(@name, 'store') or contains(@class, 'store'))]",
-                        "//input[@type='checkbox' and (contains(translate(@id, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'remember'))]",
-                        "//input[@type='checkbox' and (contains(translate(@name, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'remember'))]",
-                        "//input[@type='checkbox' and (contains(translate(@id, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'save'))]",
-                        "//input[@type='checkbox' and (contains(translate(@name, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'save'))]",
-                        "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'remember')]//input[@type='checkbox']",
-                        "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'save')]//input[@type='checkbox']"
-                    ]
-                    
-                    checkboxes_unchecked = 0
-                    for selector in remember_selectors:
-                        try:
-                            elements = self.driver.find_elements(By.XPATH, selector)
-                            for element in elements:
-                                if element.is_displayed() and element.is_selected():
-                                    # Get checkbox label for logging
-                                    try:
-                                        label_text = "Unknown"
-                                        label_id = element.get_attribute("id")
-                                        if label_id:
-                                            label_elem = self.driver.find_element(By.XPATH, f"//label[@for='{label_id}']")
-                                            if label_elem:
-                                                label_text = label_elem.text.strip()
-                                        if not label_text or label_text == "Unknown":
-                                            parent = self.driver.find_element(By.XPATH, f"//input[@id='{label_id}']/parent::*")
-                                            if parent:
-                                                label_text = parent.text.strip()
-                                    except:
-                                        pass
-                                    
-                                    logger.info(f"Unchecking save/remember checkbox: {label_text}")
-                                    try:
-                                        self.driver.execute_script("arguments[0].click();", element)
-                                    except:
-                                        element.click()
-                                    checkboxes_unchecked += 1
-                                    time.sleep(0.5)
-                        except Exception as e:
-                            logger.debug(f"Error handling remember/save checkbox with selector {selector}: {e}")
+                    checkboxes_unchecked = self._uncheck_remember_checkboxes()
                     
                     if checkboxes_unchecked > 0:
                         logger.info(f"Unchecked {checkboxes_unchecked} save/remember checkboxes")
-                        # Add a small delay after unchecking boxes
-                        time.sleep(1)
 
                     # Now try to find and click payment or complete order buttons
                     if await self.find_and_click_button(['payment', 'complete_order']):
@@ -1977,71 +3287,115 @@ class WebScraper:
             logger.error(f"Failed to execute action: {e}")
             raise
     
-    async def check_agreement_checkboxes(self) -> None:
-        """Find and check any agreement or confirmation checkboxes on the page."""
+    async def check_agreement_checkboxes(self, use_miss_cache: bool = True) -> None:
+        """Find and check any agreement or confirmation checkboxes on the page.
+        
+        Args:
+            use_miss_cache: Skip URLs whose recent visits never had an agreement
+                checkbox. Checkout passes False so the terms box is always checked.
+        """
         try:
-            logger.info("Checking for agreement/confirmation checkboxes during page scrape")
-            
-            # Common checkbox selectors related to agreements and confirmations
-            checkbox_selectors = [
-                # ID-based selectors
-                "//input[@type='checkbox' and (contains(@id, 'agree') or contains(@id, 'consent') or contains(@id, 'confirm') or contains(@id, 'accept') or contains(@id, 'terms'))]",
-                # Name-based selectors
-                "//input[@type='checkbox' and (contains(@name, 'agree') or contains(@name, 'consent') or contains(@name, 'confirm') or contains(@name, 'accept') or contains(@name, 'terms'))]",
-                # Class-based selectors
-                "//input[@type='checkbox' and (contains(@class, 'agree') or contains(@class, 'consent') or contains(@class, 'confirm') or contains(@class, 'accept') or contains(@class, 'terms'))]",
-                # Label-based selectors
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'consent') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirm') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]/input[@type='checkbox']",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'consent') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirm') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]/preceding-sibling::input[@type='checkbox']",
-                "//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'consent') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirm') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]/following-sibling::input[@type='checkbox']",
-                # For checkboxes that are children of elements with privacy/terms related text
-                "//div[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'terms')]//input[@type='checkbox']",
-                # Cookie consent checkboxes
-                "//input[@type='checkbox' and (contains(@id, 'cookie') or contains(@name, 'cookie') or contains(@class, 'cookie'))]",
-                # General unchecked checkbox (less specific, try last)
-                "//input[@type='checkbox' and not(@checked) and not(contains(@id, 'newsletter') or contains(@name, 'newsletter') or contains(@id, 'subscribe') or contains(@name, 'subscribe'))]"
-            ]
+            # Skip URLs whose recent visits never had an agreement checkbox
+            url = self.driver.current_url
+            misses, last_miss = _agreement_misses.get(url, (0, 0.0))
+            if time.monotonic() - last_miss >= _AGREEMENT_MISS_TTL:
+                misses = 0
+            if use_miss_cache and misses >= _AGREEMENT_MISS_LIMIT:
+                logger.debug(f"Skipping agreement checkboxes: none on the last {misses} visits to {url}")
+                return
             
-            checkboxes_checked = 0
-            for selector in checkbox_selectors:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                for element in elements:
-                    try:
-                        if element.is_displayed() and not element.is_selected():
-                            # Get checkbox label for logging
-                            try:
-                                label_text = "Unknown"
-                                label_id = element.get_attribute("id")
-                                if label_id:
-                                    label_elem = self.driver.find_element(By.XPATH, f"//label[@for='{label_id}']")
-                                    if label_elem:
-                                        label_text = label_elem.text.strip()
-                                if not label_text or label_text == "Unknown":
-                                    # Try parent or sibling text
-                                    parent = self.driver.find_element(By.XPATH, f"//input[@id='{label_id}']/parent::*")
-                                    if parent:
-                                        label_text = parent.text.strip()
-                            except:
-                                pass
-                            
-                            # Scroll element into view
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                            await asyncio.sleep(0.5)
-                            
-                            # Click the checkbox
-                            logger.info(f"Checking agreement checkbox during page scrape: {label_text}")
-                            try:
-                                self.driver.execute_script("arguments[0].click();", element)
-                            except:
-                                element.click()
-                            
-                            checkboxes_checked += 1
-                            await asyncio.sleep(0.5)
-                    except Exception as e:
-                        logger.debug(f"Error checking checkbox during page scrape: {e}")
+            logger.info("Checking for agreement/confirmation checkboxes during page scrape")
             
-            if checkboxes_checked > 0:
-                logger.info(f"Checked {checkboxes_checked} agreement/confirmation checkboxes during page scrape")
+            # Find, scroll to and click every candidate in one call
+            labels = self.driver.execute_script(_CALL_CHECK_AGREEMENT_JS, _AGREEMENT_CHECKBOX_CSS)
+            if labels is None:
+                labels = self.driver.execute_script(_CHECK_AGREEMENT_BOXES_JS, _AGREEMENT_CHECKBOX_CSS) or []
+            checkboxes_checked = len(labels)
+            if checkboxes_checked == 0:
+                # Boxes checked on an earlier pass mean the page has them, so
+                # only a page without any counts as a miss
+                if self.driver.execute_script(_HAS_MATCH_JS, _CHECKED_AGREEMENT_CHECKBOX_CSS):
+                    _agreement_misses.pop(url, None)
+                else:
+                    # Reinsert so the dict stays ordered by last miss
+                    _agreement_misses.pop(url, None)
+                    now = time.monotonic()
+                    if len(_agreement_misses) >= _AGREEMENT_MISS_MAX_URLS:
+                        # Purge expired entries before evicting a live one
+                        for expired in [key for key, (_, last) in _agreement_misses.items()
+                                        if now - last >= _AGREEMENT_MISS_TTL]:
+                            del _agreement_misses[expired]
+                    if len(_agreement_misses) >= _AGREEMENT_MISS_MAX_URLS:
+                        # Drop the URL whose last miss is oldest
+                        del _agreement_misses[next(iter(_agreement_misses))]
+                    _agreement_misses[url] = (misses + 1, now)
+            else:
+                _agreement_misses.pop(url, None)
+                # Let any validation or requests the clicks triggered settle
+                self._wait_ready(timeout=2)
+                logger.info(f"Checked {checkboxes_checked} agreement/confirmation checkboxes during page scrape: {labels}")
         except Exception as e:
             logger.warning(f"Error checking agreement checkboxes during page scrape: {e}")
-            # Continue with the process even if there's an error checking checkboxes
\ No newline at end of file
+            # Continue with the process even if there's an error checking checkboxes
+
+
+# Idle browsers kept ready by WebScraper.prewarm
+_WARM_POOL_SIZE = 1
+
+# Scrapers whose browser was started ahead of demand, handed out by
+# WebScraper.acquire, and the number still starting
+_warm_scrapers: List[WebScraper] = []
+_warm_pending = 0
+
+# Running prewarm tasks started by WebScraper.acquire, referenced until done
+# so they aren't garbage-collected
+_prewarm_tasks: Set[asyncio.Task] = set()
+
+# Set by quit_warm_scrapers; guarded by _warm_lock together with adding to
+# _warm_scrapers, so a browser finishing start-up after shutdown is quit
+_warm_closed = False
+_warm_lock = threading.Lock()
+
+def _start_warm_scraper(scraper: WebScraper, chrome_version: Optional[str]) -> None:
+    """Start a scraper's browser in a worker thread and add it to the warm pool."""
+    scraper._start_driver(chrome_version)
+    with _warm_lock:
+        if not _warm_closed:
+            _warm_scrapers.append(scraper)
+            return
+    # Shut down while this browser was starting
+    scraper.quit_driver()
+
+def quit_warm_scrapers() -> None:
+    """Quit the browsers pre-started for WebScraper.acquire that were never used.
+    
+    Browsers still starting are quit as soon as they are up.
+    """
+    global _warm_closed
+    with _warm_lock:
+        _warm_closed = True
+        scrapers = list(_warm_scrapers)
+        _warm_scrapers.clear()
+    for scraper in scrapers:
+        scraper.quit_driver()
+
+# Per-process state for WebScraper.scrape_many workers
+_worker_scraper: Optional[WebScraper] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _init_scrape_worker(scraper_cls: type, headless: bool, block_resources: bool) -> None:
+    """Create the scraper and event loop owned by a scrape_many worker process."""
+    global _worker_scraper, _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    _worker_scraper = scraper_cls(headless=headless, block_resources=block_resources)
+    # Worker processes skip atexit handlers, but multiprocessing finalizers still run
+    multiprocessing.util.Finalize(None, _quit_worker_driver, exitpriority=10)
+
+def _quit_worker_driver() -> None:
+    """Quit the worker's browser when the worker process exits."""
+    if _worker_scraper:
+        _worker_scraper.quit_driver()
+
+def _scrape_in_worker(url: str) -> Tuple[str, str]:
+    """Scrape one page with the worker's scraper, starting its driver on first use."""
+    return _worker_loop.run_until_complete(_worker_scraper.scrape_page(url))